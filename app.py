@@ -14,20 +14,467 @@
 # 5.) Find all the anchors in the body.html
 
 # 6.) For each anchor, find the corresponding div element and write it to a file called {endponit_name}_endpoint.htmlimport requests
-# Missing import for requests added
-import requests
 import re
 import os
-from markdownify import markdownify as md
-from bs4 import BeautifulSoup
+import argparse
+import codecs
+import hashlib
+import html
+import itertools
+import json
+import queue
+import shutil
+import sys
+import fnmatch
+import tempfile
+import threading
+import time
+from collections import deque
+from io import BytesIO
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+# requests, bs4 and the optional backends are imported where they are first used,
+# so filtered and offline runs do not pay for loading them up front.
 
-def parse_html_document(url):
-    response = requests.get(url)
+SECTIONS = ['stocks', 'options', 'indices', 'forex', 'crypto']
+BASE_URL = 'https://polygon.io/docs/{}/getting-started'
+
+DEFAULT_CONCURRENCY = len(SECTIONS)
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_CACHE_DIR = '.cache/http'
+DEFAULT_WORKERS = 1
+DEFAULT_WRITE_QUEUE_SIZE = 256
+STREAM_CHUNK_SIZE = 64 * 1024
+# Pages fetched ahead of the section being processed in low-memory runs.
+LOW_MEMORY_PREFETCH = 1
+ARCHIVE_FORMATS = ('.tar', '.tar.gz', '.tgz', '.sqlite', '.db')
+
+# BeautifulSoup tree builders the pipeline can run on. 'lxml' is much faster than the
+# pure-Python 'html.parser' but is an optional dependency (pip install lxml).
+PARSER_BACKENDS = ('html.parser', 'lxml')
+DEFAULT_PARSER = 'html.parser'
+# The only parts of a page the pipeline reads: both navs and the main content div.
+# Low-memory runs hand these to a SoupStrainer so head, scripts and styles never become a tree.
+PAGE_REGIONS = ('nav', 'div')
+
+class Profiler:
+    """Collects timing spans as Chrome trace events (chrome://tracing, Perfetto) for --profile."""
+
+    def __init__(self):
+        self.events = []
+
+    @contextmanager
+    def span(self, name, category, **args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append({
+                'name': name, 'cat': category, 'ph': 'X',
+                'ts': start // 1000, 'dur': (time.perf_counter_ns() - start) // 1000,
+                'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+            })
+
+    def write_trace(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, file)
+
+    def self_times(self):
+        """Return each event's duration minus the spans nested directly inside it on the same thread."""
+        self_times = [event['dur'] for event in self.events]
+        # Parents sort before the spans they contain: same thread, earlier start, longer first.
+        order = sorted(range(len(self.events)), key=lambda index: (
+            self.events[index]['pid'], self.events[index]['tid'], self.events[index]['ts'], -self.events[index]['dur']))
+        stack = []
+        for index in order:
+            event = self.events[index]
+            thread = (event['pid'], event['tid'])
+            while stack and (stack[-1][0] != thread or stack[-1][1] <= event['ts']):
+                stack.pop()
+            if stack:
+                self_times[stack[-1][2]] -= event['dur']
+            stack.append((thread, event['ts'] + event['dur'], index))
+        return [max(self_time, 0) for self_time in self_times]
+
+    def summary(self, limit=10):
+        """Return a text summary of self time per stage and the slowest endpoints.
+
+        Stage totals exclude nested spans (e.g. write_endpoint_files inside
+        find_anchors_and_corresponding_divs), so no time is counted twice.
+        """
+        stage_totals = {}
+        for event, self_time in zip(self.events, self.self_times()):
+            if event['cat'] in ('stage', 'extractor'):
+                key = (event['cat'], event['name'])
+                stage_totals[key] = stage_totals.get(key, 0) + self_time
+        lines = ['Self time per stage and extractor (ms), excluding nested spans:']
+        for (category, name), total in sorted(stage_totals.items(), key=lambda item: -item[1]):
+            lines.append(f"  {total / 1000:>10.1f}  {category:<10} {name}")
+        endpoints = sorted((event for event in self.events if event['cat'] == 'endpoint'), key=lambda event: -event['dur'])
+        lines.append(f'Slowest {min(limit, len(endpoints))} endpoints (ms):')
+        for event in endpoints[:limit]:
+            lines.append(f"  {event['dur'] / 1000:>10.1f}  {event['args'].get('section') or '-':<10} {event['name']}")
+        return '\n'.join(lines)
+
+class _NullSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+# Set by run(profile=True); while it is None every span is a shared no-op.
+PROFILER = None
+
+def span(name, category='stage', **args):
+    """Time a block when profiling is enabled."""
+    if PROFILER is None:
+        return _NULL_SPAN
+    return PROFILER.span(name, category, **args)
+
+def create_session(pool_size=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Create a keep-alive session with a connection pool and retry/backoff on transient errors."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def _cache_entry_path(cache_dir, url):
+    return f"{cache_dir}/urls/{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+_TEMPORARY_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0)
+
+def _open_temporary(directory):
+    """Create a uniquely named temporary file in directory and return (fd, path).
+
+    Unlike mkstemp, which makes files readable by the owner only, the file gets
+    the permissions a plain open() would give it under the current umask.
+    """
+    while True:
+        tmp_path = os.path.join(directory, f'.tmp-{os.urandom(6).hex()}')
+        try:
+            return os.open(tmp_path, _TEMPORARY_FLAGS, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+def _write_atomic(path, data):
+    """Write data to a temporary file next to path and rename it into place."""
+    fd, tmp_path = _open_temporary(os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_file(tmp_path)
+        raise
+
+def load_cached_document(cache_dir, url):
+    """Return (metadata, text) for a cached url, or (None, None) when it was never cached."""
+    try:
+        with open(_cache_entry_path(cache_dir, url), 'r') as file:
+            entry = json.load(file)
+        with open(f"{cache_dir}/objects/{entry['sha256']}.html", 'rb') as file:
+            return entry, file.read().decode('utf-8')
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+def store_cached_document(cache_dir, url, text, etag=None, last_modified=None):
+    """Store the document body by content hash and record its validators for the url."""
+    os.makedirs(f'{cache_dir}/objects', exist_ok=True)
+    os.makedirs(f'{cache_dir}/urls', exist_ok=True)
+    data = text.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    object_path = f'{cache_dir}/objects/{digest}.html'
+    if not os.path.exists(object_path):
+        _write_atomic(object_path, data)
+    _store_cache_entry(cache_dir, url, digest, etag, last_modified)
+
+def _store_cache_entry(cache_dir, url, digest, etag=None, last_modified=None):
+    entry = {'url': url, 'sha256': digest, 'etag': etag, 'last_modified': last_modified}
+    _write_atomic(_cache_entry_path(cache_dir, url), json.dumps(entry, indent=2).encode('utf-8'))
+
+def _read_streamed_document(response, url, cache_dir=None):
+    """Decode a streamed response chunk by chunk with response.encoding (utf-8 if unset), caching it as it arrives."""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    parts = []
+    cache_file = tmp_path = None
+    if cache_dir:
+        os.makedirs(f'{cache_dir}/objects', exist_ok=True)
+        os.makedirs(f'{cache_dir}/urls', exist_ok=True)
+        fd, tmp_path = _open_temporary(f'{cache_dir}/objects')
+        cache_file = os.fdopen(fd, 'wb')
+        digest = hashlib.sha256()
+    try:
+        # A trailing None flushes the decoder.
+        for chunk in itertools.chain(response.iter_content(STREAM_CHUNK_SIZE), [None]):
+            text = decoder.decode(chunk or b'', final=chunk is None)
+            parts.append(text)
+            if cache_file is not None:
+                data = text.encode('utf-8')
+                digest.update(data)
+                cache_file.write(data)
+        if cache_file is not None:
+            cache_file.close()
+            os.replace(tmp_path, f'{cache_dir}/objects/{digest.hexdigest()}.html')
+            _store_cache_entry(cache_dir, url, digest.hexdigest(), etag=response.headers.get('ETag'),
+                               last_modified=response.headers.get('Last-Modified'))
+    except BaseException:
+        if cache_file is not None:
+            cache_file.close()
+            _remove_file(tmp_path)
+        raise
+    return ''.join(parts)
+
+def fetch_html_document(url, session=None, timeout=DEFAULT_TIMEOUT, cache_dir=None, offline=False,
+                        stream=False):
+    """Download the html document at the given url and return its text.
+
+    With a cache_dir, the previous copy is revalidated with If-None-Match /
+    If-Modified-Since and reused on a 304. With offline=True the cached copy
+    is replayed without touching the network. With stream=True the body is
+    read and cached in chunks instead of being buffered whole.
+    """
+    entry, cached_text = load_cached_document(cache_dir, url) if cache_dir else (None, None)
+    if offline:
+        if cached_text is None:
+            raise Exception(f"No cached copy of {url} available for offline mode.")
+        return cached_text
+
+    headers = {}
+    if cached_text is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    if session is None:
+        import requests
+
+        response = requests.get(url, timeout=timeout, headers=headers, stream=stream)
+    else:
+        response = session.get(url, timeout=timeout, headers=headers, stream=stream)
+    if stream and response.status_code != 200:
+        # An unread streamed body holds on to its pooled connection until it is closed.
+        response.close()
+    if response.status_code == 304 and cached_text is not None:
+        return cached_text
+    if response.status_code == 200 and stream:
+        return _read_streamed_document(response, url, cache_dir)
     if response.status_code == 200:
-        return BeautifulSoup(response.text, 'html.parser')
+        if cache_dir:
+            store_cached_document(cache_dir, url, response.text,
+                                  etag=response.headers.get('ETag'),
+                                  last_modified=response.headers.get('Last-Modified'))
+        return response.text
     else:
         raise Exception(f"Failed to retrieve the document. Status code: {response.status_code}")
 
+def make_soup(markup, parser=DEFAULT_PARSER, parse_only=None):
+    """Parse markup with the selected backend, keeping only the parse_only tag names if given."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    if parser not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{parser}'. Choose one of: {', '.join(PARSER_BACKENDS)}")
+    if parser == 'lxml':
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            raise ImportError("The 'lxml' parser backend requires lxml. Install it with: pip install lxml")
+    return BeautifulSoup(markup, parser, parse_only=SoupStrainer(list(parse_only)) if parse_only else None)
+
+class DirectoryWriter:
+    """Writes output files atomically, leaving files whose content is unchanged untouched."""
+
+    # The output tree is updated in place, so manifests of earlier runs describe it.
+    starts_empty = False
+
+    def write(self, path, text):
+        data = text.encode('utf-8')
+        try:
+            with open(path, 'rb') as file:
+                if file.read() == data:
+                    return
+        except FileNotFoundError:
+            pass
+        # Not cached: the directory may have been removed since the last write.
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        _write_atomic(path, data)
+
+    def remove(self, path):
+        _remove_file(path)
+
+    def close(self, commit=True):
+        # Every file was already renamed into place as it was written.
+        pass
+
+class TarWriter:
+    """Writes every output file into one tar archive, compressed when the name ends in .gz/.tgz.
+
+    The archive is built under a temporary name and renamed into place on close;
+    close(commit=False) discards it and leaves any previous archive untouched.
+    Entries are stored relative to root; a rewritten path is appended again,
+    which tar extraction resolves in favour of the last copy.
+    """
+
+    # Rebuilt from scratch, so nothing recorded on disk belongs to it.
+    starts_empty = True
+
+    def __init__(self, archive_path, root):
+        self.archive_path = archive_path
+        self.root = root
+        self.tmp_path = f'{archive_path}.tmp'
+        os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+        import tarfile
+
+        self.tarfile = tarfile
+        mode = 'w:gz' if archive_path.endswith(('.tar.gz', '.tgz')) else 'w'
+        self.archive = tarfile.open(self.tmp_path, mode)
+
+    def write(self, path, text):
+        data = text.encode('utf-8')
+        info = self.tarfile.TarInfo(os.path.relpath(path, self.root))
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.archive.addfile(info, BytesIO(data))
+
+    def remove(self, path):
+        # Archives are rebuilt on every run, so there is nothing stale to remove.
+        pass
+
+    def close(self, commit=True):
+        self.archive.close()
+        if commit:
+            os.replace(self.tmp_path, self.archive_path)
+        else:
+            _remove_file(self.tmp_path)
+
+class SqliteWriter:
+    """Writes every output file as a row of a files(path, content) table in one SQLite database.
+
+    Like TarWriter, the database is built under a temporary name and only
+    replaces the previous one when close() commits.
+    """
+
+    starts_empty = True
+
+    def __init__(self, archive_path, root):
+        self.archive_path = archive_path
+        self.root = root
+        self.tmp_path = f'{archive_path}.tmp'
+        os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+        import sqlite3
+
+        _remove_file(self.tmp_path)
+        self.connection = sqlite3.connect(self.tmp_path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE files (path TEXT PRIMARY KEY, content TEXT NOT NULL)')
+
+    def write(self, path, text):
+        self.connection.execute('INSERT OR REPLACE INTO files (path, content) VALUES (?, ?)',
+                                (os.path.relpath(path, self.root), text))
+
+    def remove(self, path):
+        self.connection.execute('DELETE FROM files WHERE path = ?', (os.path.relpath(path, self.root),))
+
+    def close(self, commit=True):
+        if commit:
+            self.connection.commit()
+        self.connection.close()
+        if commit:
+            os.replace(self.tmp_path, self.archive_path)
+        else:
+            _remove_file(self.tmp_path)
+
+def create_archive_writer(archive_path, root):
+    """Pick the single-artifact writer for archive_path from its extension."""
+    if archive_path.endswith(('.sqlite', '.db')):
+        return SqliteWriter(archive_path, root)
+    if archive_path.endswith(('.tar', '.tar.gz', '.tgz')):
+        return TarWriter(archive_path, root)
+    raise ValueError(f"Unsupported archive '{archive_path}'. Use one of: {', '.join(ARCHIVE_FORMATS)}")
+
+class BackgroundWriter:
+    """Hands writes to a sink on a background thread through a bounded queue.
+
+    The pipeline only blocks when max_pending writes are already waiting. The
+    first error raised by the sink is re-raised on the next write or on close.
+    """
+
+    def __init__(self, sink, max_pending=DEFAULT_WRITE_QUEUE_SIZE):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self._drain, name='output-writer', daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is None:
+                operation, args = item
+                try:
+                    getattr(self.sink, operation)(*args)
+                except BaseException as error:
+                    self.error = error
+
+    def _submit(self, operation, *args):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((operation, args))
+
+    def write(self, path, text):
+        self._submit('write', path, text)
+
+    def remove(self, path):
+        self._submit('remove', path)
+
+    def close(self, commit=True):
+        """Flush pending writes and close the sink.
+
+        The sink only commits its output (e.g. renames an archive into place)
+        when commit is true and every write succeeded.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        self.sink.close(commit=commit and self.error is None)
+        if self.error is not None:
+            raise self.error
+
+_DIRECT_WRITER = DirectoryWriter()
+# Set by run() to a BackgroundWriter; without one, files are written directly.
+WRITER = None
+
+def write_output(path, text):
+    """Write an output file through the active writer."""
+    (WRITER or _DIRECT_WRITER).write(path, text)
+
+def remove_output(path):
+    """Remove an output file through the active writer."""
+    (WRITER or _DIRECT_WRITER).remove(path)
+
+def read_recorded_manifest(manifest_path):
+    """Read a manifest of an earlier run, or return None when the active writer builds a new archive."""
+    if WRITER is not None and WRITER.sink.starts_empty:
+        return None
+    return read_manifest(manifest_path)
+
 def remove_first_nav_element(soup):
     nav = soup.find('nav')
     if nav:
@@ -36,16 +483,164 @@ def remove_first_nav_element(soup):
 def extract_and_save_main_nav(soup, html_dir):
     nav = soup.find('nav')
     if nav:
-        with open(f'{html_dir}/sidebar.html', 'w') as file:
-            file.write(str(nav))
+        write_output(f'{html_dir}/sidebar.html', str(nav))
         nav.decompose()
 
 def extract_and_save_main_content(soup, html_dir):
+    """Detach the main content from the document and return it.
+
+    body.html is still written as a debug artifact, but it is never read back;
+    every extractor works on the returned subtree directly.
+    """
     div = soup.find('div')
     if div:
-        with open(f'{html_dir}/body.html', 'w') as file:
-            file.write(str(div))
+        write_output(f'{html_dir}/body.html', str(div))
+        # Detach so searches (e.g. find_all_next) stay bounded to the body,
+        # exactly as they were when body.html was re-parsed.
+        div.extract()
+    return div
+
+
+@dataclass(slots=True)
+class EndpointUrl:
+    label: str | None
+    url: str
+
+@dataclass(slots=True)
+class EndpointMethod:
+    method: str
+    urls: list[EndpointUrl]
+
+@dataclass(slots=True)
+class Parameter:
+    name: str
+    required: bool
+    description: str
+    options: list[str] | None = None
+
+@dataclass(slots=True)
+class Attribute:
+    name: str
+    required: bool
+    type: str
+    description: str
+    children: list['Attribute'] = field(default_factory=list)
+
+@dataclass(slots=True)
+class Endpoint:
+    """Everything parse_endpoint extracts from one endpoint container."""
+    methods: list[EndpointMethod] = field(default_factory=list)
+    descriptions: list[str] = field(default_factory=list)
+    parameters: list[Parameter] = field(default_factory=list)
+    example_request: str | None = None
+    attributes: list[Attribute] = field(default_factory=list)
+    example_response: str | None = None
+
+
+def _parameter_description(description_div):
+    """Flatten a parameter description, keeping links as markdown links."""
+    param_desc = ""
+    for content in description_div.contents:
+        if content.name == 'a' and content.has_attr('href'):
+            link_text = content.get_text().strip()
+            link_href = content['href']
+            param_desc += f"[{link_text}]({link_href})"
+        else:
+            param_desc += content if isinstance(content, str) else content.get_text()
+    return param_desc.strip()
 
+def _response_attribute(attr_div):
+    """Return the Attribute described by an attribute div, or None if it is incomplete."""
+    name_span = attr_div.find('span', class_='Text__StyledText-sc-6aor3p-0 ggvwlD')
+    type_span = attr_div.find('span', class_='Text__StyledText-sc-6aor3p-0 eelqYu')
+    description_p = attr_div.find('div', class_='ResponseAttributes__Description-sc-hzb6em-1')
+    if name_span and type_span and description_p:
+        name = name_span.get_text().strip()
+        return Attribute(name.replace('*', '').strip(), '*' in name, type_span.get_text().strip(),
+                         description_p.get_text().strip())
+    return None
+
+def parse_endpoint(element):
+    """Walk an endpoint container once and collect it into an Endpoint.
+
+    Only the candidate elements found during the walk are inspected further, so
+    the cost scales with the size of the container rather than with the number
+    of renderers.
+    """
+    endpoint = Endpoint()
+    method_elements = []
+    url_elements = []
+    param_divs = []
+    attribute_divs = []
+    for tag in element.find_all(True):
+        classes = tag.get('class', [])
+        if tag.name == 'div':
+            if 'Text__StyledText-sc-6aor3p-0' in classes:
+                url_elements.append(tag)
+                if 'jugoJw' in classes:
+                    endpoint.descriptions.append(tag.get_text().strip())
+            if 'Parameters__MaxWidth-sc-ize944-0' in classes:
+                param_divs.append(tag)
+            if 'ResponseAttributes__OverflowXAuto-sc-hzb6em-0' in classes:
+                attribute_divs.append(tag)
+            if endpoint.example_request is None and ' '.join(classes) == 'Copy__TextWrapper-sc-71i6s4-1 bsrJTO':
+                endpoint.example_request = tag.get_text().strip()
+        elif tag.name == 'span':
+            if 'base__RequestMethod-sc-127j6tq-1' in classes:
+                method_elements.append(tag)
+        elif tag.name == 'pre' and endpoint.example_response is None:
+            endpoint.example_response = tag.get_text().strip()
+
+    # Each request method pairs with the styled text div at the same position.
+    for method_element, url_element in zip(method_elements, url_elements):
+        method = method_element.get_text().strip().upper()
+        urls = url_element.find_all('div')
+        if len(urls) > 1:
+            labelled_urls = []
+            for url in urls:
+                label = url.find('label')
+                if label:
+                    label_text = label.get_text().strip()
+                    labelled_urls.append(EndpointUrl(label_text, url.get_text().strip().replace(label_text, '').strip()))
+                else:
+                    labelled_urls.append(EndpointUrl(None, url.get_text().strip()))
+            endpoint.methods.append(EndpointMethod(method, labelled_urls))
+        else:
+            # Fallback to the text of the url_element itself if no divs are found
+            url_text = (urls[0] if urls else url_element).get_text().strip()
+            endpoint.methods.append(EndpointMethod(method, [EndpointUrl(None, url_text)]))
+
+    for param_div in param_divs:
+        label = param_div.find('label')
+        if label:
+            param_name = ' '.join(label.stripped_strings).strip()
+            description_div = param_div.find_next_sibling('div', class_='Parameters__Description-sc-ize944-1')
+            param_options = param_div.find('menu')
+            endpoint.parameters.append(Parameter(
+                param_name.replace('*', '').strip(),
+                '*' in param_name,
+                _parameter_description(description_div) if description_div else "",
+                [li.get_text().strip() for li in param_options.find_all('li')] if param_options else None,
+            ))
+
+    for attr_div in attribute_divs:
+        attribute = _response_attribute(attr_div)
+        if attribute is None:
+            continue
+        if attribute.type.lower() == 'array':
+            # Handle nested structure for array type
+            nested_attrs = attr_div.find_next_sibling('div')
+            if nested_attrs:
+                for nested_attr_div in nested_attrs.find_all('div', recursive=False):
+                    nested_attribute = _response_attribute(nested_attr_div)
+                    if nested_attribute:
+                        attribute.children.append(nested_attribute)
+        endpoint.attributes.append(attribute)
+
+    return endpoint
+
+
+REQUIRED_MARKER = " <span style='color: red'>*</span>"
 
 def endpoint_heading(element):
     """Extract and format the endpoint heading from the given HTML element."""
@@ -56,34 +651,15 @@ def endpoint_heading(element):
         return f"## <a href='{endpoint_url}'> {endpoint_name} </a>\n\n"
     return ""
 
-def endpoint_parameters(element):
-    """Extract and format the parameters from the given HTML element."""
-    parameters_md = "\n#### Parameters\n\n<span style='color: red'>*</span> indicates a required parameter.\n\n"
-    param_divs = element.find_all('div', class_='Parameters__MaxWidth-sc-ize944-0')
-    for param_div in param_divs:
-        label = param_div.find('label')
-        if label:
-            param_name = ' '.join(label.stripped_strings).strip()
-            is_required = '*' in param_name
-            param_name = param_name.replace('*', '').strip()
-            required_text = " <span style='color: red'>*</span>" if is_required else ""
-            description_div = param_div.find_next_sibling('div', class_='Parameters__Description-sc-ize944-1')            
-            param_desc = ""
-            if description_div:
-                for content in description_div.contents:
-                    if content.name == 'a' and content.has_attr('href'):
-                        link_text = content.get_text().strip()
-                        link_href = content['href']
-                        param_desc += f"[{link_text}]({link_href})"
-                    else:
-                        param_desc += content if isinstance(content, str) else content.get_text()
-            param_desc = param_desc.strip()
-            parameters_md += f"- **{param_name}{required_text}**: {param_desc}\n"
-            param_options = param_div.find('menu')
-            if param_options:
-                options_md = '\n'.join([f"  - `{li.get_text().strip()}`" for li in param_options.find_all('li')])
-                parameters_md += options_md + "\n\n"
-    return parameters_md
+def endpoint_parameters(endpoint):
+    """Format the parameters of an Endpoint."""
+    lines = ["\n#### Parameters\n\n<span style='color: red'>*</span> indicates a required parameter.\n\n"]
+    for param in endpoint.parameters:
+        required_text = REQUIRED_MARKER if param.required else ""
+        lines.append(f"- **{param.name}{required_text}**: {param.description}\n")
+        if param.options is not None:
+            lines.append('\n'.join([f"  - `{option}`" for option in param.options]) + "\n\n")
+    return ''.join(lines)
 def sanitize_filename(name):
     """Sanitize the filename to remove special characters."""
     sanitized_name = re.sub(r'[^\w\s-]', '_', name)
@@ -92,11 +668,8 @@ def sanitize_filename(name):
     sanitized_name = re.sub(r'_{2,}', '_', sanitized_name)  # Ensure only one underscore before '_endpoint'
     return sanitized_name
 
-def create_websocket_api_overview_markdown(html_dir, markdown_dir):
-    with open(f'{html_dir}/body.html', 'r') as file:
-        soup = BeautifulSoup(file.read(), 'html.parser')
-
-    websocket_section = soup.find('div', class_='Grid__Component-sc-h1tb5o-0 Grid__StyledGrid-sc-h1tb5o-1 eKoQMw hNiMUQ StyledSpacing-sc-wahrw5-0 bbSzhC StyledSpacing-sc-wahrw5-0 NOTdS')
+def create_websocket_api_overview_markdown(body, markdown_dir):
+    websocket_section = body.find('div', class_='Grid__Component-sc-h1tb5o-0 Grid__StyledGrid-sc-h1tb5o-1 eKoQMw hNiMUQ StyledSpacing-sc-wahrw5-0 bbSzhC StyledSpacing-sc-wahrw5-0 NOTdS')
     if not websocket_section:
         raise ValueError("WebSocket section not found in the HTML document.")
 
@@ -122,164 +695,425 @@ def create_websocket_api_overview_markdown(html_dir, markdown_dir):
             websocket_overview_md += f"##### {element.get_text().strip()}\n\n"
 
     # Write to markdown file
-    with open(f'{markdown_dir}/websocket/websocket_api_overview.md', 'w') as file:
-        file.write(websocket_overview_md)
-
-def find_anchors_and_corresponding_divs(html_dir, markdown_dir):
-    rest_markdown_path = f'{markdown_dir}/rest'
-    websocket_markdown_path = f'{markdown_dir}/websocket'
-    with open(f'{html_dir}/body.html', 'r') as file:
-        soup = BeautifulSoup(file.read(), 'html.parser')
-    anchors = soup.find_all('a')
-    for anchor in anchors:
+    write_output(f'{markdown_dir}/websocket/websocket_api_overview.md', websocket_overview_md)
+    return websocket_overview_md
+
+# Bump when the markdown rendering changes so incremental runs regenerate every endpoint.
+RENDERER_VERSION = 2
+
+def _extract(extractor, endpoint):
+    if PROFILER is None:
+        return extractor(endpoint)
+    with PROFILER.span(extractor.__name__, 'extractor'):
+        return extractor(endpoint)
+
+def render_endpoint_markdown(heading, endpoint):
+    """Render the markdown document for a parsed Endpoint."""
+    markdown = ''.join([
+        heading,
+        _extract(endpoint_details, endpoint),
+        _extract(endpoint_description, endpoint),
+        "### Request\n\n",
+        _extract(endpoint_parameters, endpoint),
+        _extract(example_endpoint_request, endpoint),
+        "### Response\n\n",
+        _extract(endpoint_response_attributes, endpoint),
+        _extract(endpoint_response_object, endpoint),
+    ])
+    return markdown.replace('‘', '`').replace('’', '`')
+
+def render_endpoint(heading, endpoint_element):
+    """Parse an endpoint container and return (Endpoint, markdown)."""
+    endpoint = _extract(parse_endpoint, endpoint_element)
+    return endpoint, render_endpoint_markdown(heading, endpoint)
+
+def render_serialized_endpoint(heading, endpoint_html, parser=DEFAULT_PARSER, name=None, section=None,
+                               profile=False):
+    """Process pool entry point: re-parse a serialized endpoint container and render it.
+
+    Returns (Endpoint, markdown, trace events); the events are only collected
+    when profile is set, so the parent can merge them into its own trace.
+    """
+    global PROFILER
+    previous, PROFILER = PROFILER, (Profiler() if profile else None)
+    try:
+        with span(name, 'endpoint', section=section):
+            endpoint, markdown = render_endpoint(heading, make_soup(endpoint_html, parser).find('div'))
+        return endpoint, markdown, PROFILER.events if PROFILER else None
+    finally:
+        PROFILER = previous
+
+def _render_source(source, section):
+    with span(source.file_name, 'endpoint', section=section):
+        return render_endpoint(source.heading, source.element) + (None,)
+
+def read_manifest(manifest_path):
+    """Return the raw contents of a section manifest, or None if it cannot be read."""
+    try:
+        with open(manifest_path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def manifest_endpoints(manifest):
+    """Return the endpoint entries of a manifest keyed by endpoint_key, also for manifests keyed by file name."""
+    endpoints = {}
+    for key, entry in (manifest or {}).get('endpoints', {}).items():
+        name = entry.get('name', key)
+        endpoints[endpoint_key(entry['kind'], name)] = {**entry, 'name': name}
+    return endpoints
+
+def endpoint_key(kind, file_name):
+    """Manifest key of an endpoint: its markdown path below the markdown directory, without .md.
+
+    A REST endpoint and a WebSocket channel may share a title, so the file name alone is not unique.
+    """
+    return f'{kind}/{file_name}'
+
+def save_manifest(manifest_path, endpoints, overviews=None):
+    manifest = {'renderer_version': RENDERER_VERSION, 'overviews': overviews or {}, 'endpoints': endpoints}
+    write_output(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+
+def reference_title(markdown, md_file):
+    """Display name of a markdown document in the modular reference: its first heading, without markup."""
+    first_line = markdown.split('\n', 1)[0].strip()
+    if first_line.startswith('#'):
+        return html.unescape(re.sub(r'<[^>]*>', '', first_line)).replace('##', '').strip()
+    return md_file.replace('_', ' ').replace('.md', '')
+
+def index_endpoint_anchors(body):
+    """Map every endpoint anchor in the body to its endpoint container in a single pass.
+
+    An endpoint anchor is an <a> with the ScrollTargetLink__Anchor class and an
+    <h2> title. Its container is the closest div without a class attribute above
+    the div that holds the anchor. Returns (anchor, sanitized name, container)
+    tuples in page order.
+    """
+    index = []
+    # Each entry carries the context its children see: the closest div, the closest
+    # classless div above that one, and the closest classless div including it.
+    root_classless = body if body.name == 'div' and not body.has_attr('class') else None
+    stack = [(body, body if body.name == 'div' else None, None, root_classless)]
+    while stack:
+        tag, div, container, classless = stack.pop()
+        children = []
+        for child in tag.children:
+            if child.name is None:
+                continue
+            if child.name == 'div':
+                child_classless = classless if child.has_attr('class') else child
+                children.append((child, child, classless, child_classless))
+                continue
+            if (child.name == 'a' and 'ScrollTargetLink__Anchor-sc-yy6ew6-0' in child.get('class', [])
+                    # Skip the Stocks WebSocket Documentation section
+                    and 'ws_getting-started' not in child.get('href', '')):
+                h2 = child.find('h2')
+                endpoint_name = sanitize_filename(h2.text) if h2 else None
+                if endpoint_name and div is not None and container is not None:
+                    index.append((child, endpoint_name, container))
+                    continue
+            children.append((child, div, container, classless))
+        stack.extend(reversed(children))
+    return index
+
+# The attribute text of a start tag, which may contain '>' inside quoted values.
+_SCAN_ATTRIBUTES = r'((?:"[^"]*"|\'[^\']*\'|[^\'">])*)'
+_SCAN_TOKEN = re.compile(r'<!--.*?-->|<(script|style)\b.*?</\1\s*>|<(/?)(div|a)\b' + _SCAN_ATTRIBUTES + '>',
+                         re.S | re.I)
+_SCAN_H2 = re.compile(r'<h2\b' + _SCAN_ATTRIBUTES + r'>(.*?)</h2\s*>', re.S | re.I)
+_SCAN_CLOSE_A = re.compile(r'</a\s*>', re.I)
+_SCAN_ATTRIBUTE = re.compile(r'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]*)))?')
+
+def _scan_attributes(attrs):
+    """Parse the attribute text of a start tag into {lowercased name: unescaped value}."""
+    attributes = {}
+    for name, double, single, bare in _SCAN_ATTRIBUTE.findall(attrs):
+        # A later duplicate wins, as it does in the tree.
+        attributes[name.lower()] = html.unescape(double or single or bare)
+    return attributes
+
+def scan_endpoint_anchors(html_text):
+    """Find the endpoint containers of a raw page with the rules of index_endpoint_anchors, without a tree.
+
+    Returns (sanitized name, href, start, end) tuples in page order, where html_text[start:end] is the container.
+    """
+    found = []
+    # Open divs as [start, classless, end]; containers get their end once the div closes.
+    stack = []
+    for match in _SCAN_TOKEN.finditer(html_text):
+        closing, tag, attrs = match.group(2), match.group(3), match.group(4)
+        if tag is None or attrs.rstrip().endswith('/'):
+            continue
+        if tag.lower() == 'div':
+            if not closing:
+                classless = 'class' not in attrs.lower() or 'class' not in _scan_attributes(attrs)
+                stack.append([match.start(), classless, None])
+            elif stack:
+                stack.pop()[2] = match.end()
+            continue
+        if closing or 'ScrollTargetLink__Anchor-sc-yy6ew6-0' not in attrs or not stack:
+            continue
+        attributes = _scan_attributes(attrs)
+        if 'ScrollTargetLink__Anchor-sc-yy6ew6-0' not in attributes.get('class', '').split():
+            continue
+        href = attributes.get('href', '')
         # Skip the Stocks WebSocket Documentation section
-        if 'ws_getting-started' in anchor.get('href', ''):
+        if 'ws_getting-started' in href:
             continue
-        h2 = anchor.find('h2')
-        endpoint_name = sanitize_filename(h2.text) if h2 else None
+        container = next((div for div in reversed(stack[:-1]) if div[1]), None)
+        close = _SCAN_CLOSE_A.search(html_text, match.end())
+        h2 = _SCAN_H2.search(html_text, match.end(), close.start() if close else len(html_text))
+        if container is None or h2 is None:
+            continue
+        endpoint_name = sanitize_filename(html.unescape(re.sub(r'<[^>]*>', '', h2.group(2))))
         if endpoint_name:
-            endpoint_element = anchor.find_parent('div')
-            while True:
-                # Find the parent <div> element
-                endpoint_element = endpoint_element.find_parent('div')
-
-                # If the parent <div> has no class attribute, break the loop
-                if endpoint_element is None or not endpoint_element.has_attr('class'):
-                    break
-            if endpoint_element:
-                endpoint_file_name = sanitize_filename(f"{endpoint_name}_endpoint")
-                with open(f'{html_dir}/{endpoint_file_name}.html', 'w') as file:
-                    file.write(str(endpoint_element))
-                markdown = endpoint_heading(anchor)
-                markdown += endpoint_details(endpoint_element)
-                markdown += endpoint_description(endpoint_element)
-                markdown += "### Request\n\n"
-                markdown += endpoint_parameters(endpoint_element)
-                markdown += example_endpoint_request(endpoint_element)
-                markdown += "### Response\n\n"
-                markdown += endpoint_response_attributes(endpoint_element)                
-                markdown += endpoint_response_object(endpoint_element)
-                markdown = markdown.replace('‘', '`').replace('’', '`')
-                # Determine if the endpoint is a WebSocket endpoint
-                is_websocket_endpoint = "- Method: `WS`" in markdown
-                # Choose the correct path based on the endpoint type
-                markdown_path = websocket_markdown_path if is_websocket_endpoint else rest_markdown_path
-                with open(f'{markdown_path}/{endpoint_file_name}.md', 'w') as file:
-                    file.write(markdown)
-
-
-def example_endpoint_request(element):
-    """Extract and format the example endpoint request from the given HTML element."""
+            found.append((endpoint_name, href, container))
+    return [(name, href, div[0], div[2]) for name, href, div in found if div[2] is not None]
+
+def endpoint_matches(endpoint_file_name, patterns):
+    """True if an endpoint file name matches any of the (case-insensitive) name or glob patterns.
+
+    The trailing _endpoint is optional, so aggregates_bars and
+    aggregates_bars_endpoint select the same file.
+    """
+    name = endpoint_file_name.removesuffix('_endpoint')
+    return any(fnmatch.fnmatchcase(name, pattern.lower()) or fnmatch.fnmatchcase(endpoint_file_name, pattern.lower())
+               for pattern in patterns)
+
+@dataclass(slots=True)
+class EndpointSource:
+    """An endpoint container found on the page, and whether it needs rendering this run."""
+    file_name: str
+    title: str
+    heading: str
+    element: object
+    html: str
+    digest: str
+    render: bool
+    # Unchanged endpoints are parsed right away for the spec, so their container can be released.
+    endpoint: object = None
+
+class SectionOutput:
+    """Plans, writes and records the endpoint files of one section against its previous manifest."""
+
+    def __init__(self, html_dir, markdown_dir, manifest_path=None, force=False, spec=None, section=None):
+        self.html_dir = html_dir
+        self.markdown_dir = markdown_dir
+        self.manifest_path = manifest_path
+        self.spec = spec
+        self.section = section
+        manifest = read_recorded_manifest(manifest_path) if manifest_path is not None else None
+        # Removals and moves follow whatever the last run recorded; only skipping an
+        # unchanged endpoint depends on force and the renderer version.
+        self.recorded = manifest_endpoints(manifest)
+        self.up_to_date = manifest is not None and manifest.get('renderer_version') == RENDERER_VERSION
+        self.previous = {}
+        if self.up_to_date and not force:
+            for key, entry in self.recorded.items():
+                self.previous.setdefault(entry['name'], []).append(entry)
+        self.current = {}
+        self.report = {'added': [], 'changed': [], 'removed': [], 'unchanged': []}
+
+    def plan(self, index, endpoints=None):
+        """Yield an EndpointSource per matching endpoint in page order; unchanged ones only for the spec."""
+        # Keys kept unchanged, and names rendered, so far; a rendered endpoint's kind is
+        # only known once its markdown exists.
+        claimed = set()
+        rendered = set()
+        last_element = cached = None
+        for anchor, endpoint_name, endpoint_element in index:
+            endpoint_file_name = sanitize_filename(f"{endpoint_name}_endpoint")
+            if endpoints and not endpoint_matches(endpoint_file_name, endpoints):
+                continue
+            # Anchors sharing a container follow each other and reuse its serialized html and hash.
+            if endpoint_element is not last_element:
+                endpoint_html = str(endpoint_element)
+                cached = endpoint_html, hashlib.sha256(endpoint_html.encode('utf-8')).hexdigest()
+                last_element = endpoint_element
+            endpoint_html, digest = cached
+            known = next((entry for entry in self.previous.get(endpoint_file_name, ())
+                          if entry['sha256'] == digest), None)
+            key = known and endpoint_key(known['kind'], endpoint_file_name)
+            # A repeated name within this run must be rendered again so the last one still wins.
+            unchanged = (known and key not in claimed and endpoint_file_name not in rendered
+                         and os.path.exists(f'{self.markdown_dir}/{key}.md'))
+            if unchanged:
+                claimed.add(key)
+                self.current[key] = known
+                self.report['unchanged'].append(key)
+                if self.spec is None:
+                    continue
+            else:
+                rendered.add(endpoint_file_name)
+            source = EndpointSource(endpoint_file_name, anchor.find('h2').get_text().strip(),
+                                    endpoint_heading(anchor), endpoint_element, endpoint_html, digest,
+                                    render=not unchanged)
+            if unchanged:
+                source.endpoint, source.element = parse_endpoint(endpoint_element), None
+            yield source
+
+    def write(self, source, endpoint, markdown, events=None):
+        """Write a rendered endpoint (markdown is None for an unchanged one) and add it to the spec."""
+        if events:
+            PROFILER.events.extend(events)
+        if markdown is not None:
+            self._write_files(source, markdown)
+        if self.spec is not None:
+            self.spec.add_endpoint(source.title, endpoint, tag=self.section)
+
+    def _write_files(self, source, markdown):
+        endpoint_file_name = source.file_name
+        # Determine if the endpoint is a WebSocket endpoint
+        kind = 'websocket' if "- Method: `WS`" in markdown else 'rest'
+        key = endpoint_key(kind, endpoint_file_name)
+        with span('write_endpoint_files', section=self.section):
+            write_output(f'{self.html_dir}/{endpoint_file_name}.html', source.html)
+            write_output(f'{self.markdown_dir}/{key}.md', markdown)
+        if key not in self.current:
+            self.report['changed' if key in self.recorded else 'added'].append(key)
+        self.current[key] = {'sha256': source.digest, 'kind': kind, 'name': endpoint_file_name, 'title': source.title}
+
+    def finish(self, overviews=None, endpoints=None):
+        """Remove recorded endpoints that are gone, save the manifest and return the report.
+
+        A run filtered by endpoints only removes the recorded endpoints matching its patterns.
+        """
+        current = dict(self.current)
+        removed = []
+        for key, known in self.recorded.items():
+            if key in current:
+                continue
+            if endpoints and not endpoint_matches(known['name'], endpoints):
+                current[key] = known
+                continue
+            removed.append(known)
+            self.report['removed'].append(key)
+        # The html copy is shared by a REST endpoint and a WebSocket channel of the same name.
+        names = {entry['name'] for entry in current.values()}
+        for known in removed:
+            remove_output(f"{self.markdown_dir}/{endpoint_key(known['kind'], known['name'])}.md")
+            if known['name'] not in names:
+                remove_output(f"{self.html_dir}/{known['name']}.html")
+        if self.manifest_path is not None:
+            save_manifest(self.manifest_path, current, overviews)
+        self.report['endpoints'] = current
+        return self.report
+
+def render_sources(sources, executor=None, parser=DEFAULT_PARSER, section=None):
+    """Yield (source, Endpoint, markdown, trace events) in page order; markdown is None if unchanged."""
+    if executor is None:
+        # Render each source as it is reached, so its container can be released before the next one.
+        for source in sources:
+            if source.render:
+                yield (source,) + _render_source(source, section)
+            else:
+                yield source, source.endpoint, None, None
+        return
+    # A ProcessPoolExecutor re-parses the serialized containers in worker processes.
+    sources = list(sources)
+    jobs = [source for source in sources if source.render]
+    for source in jobs:
+        source.element = None
+    count = len(jobs)
+    results = executor.map(render_serialized_endpoint,
+                           [job.heading for job in jobs], [job.html for job in jobs], [parser] * count,
+                           [job.file_name for job in jobs], [section] * count, [PROFILER is not None] * count,
+                           chunksize=4)
+    for source in sources:
+        yield (source,) + next(results) if source.render else (source, source.endpoint, None, None)
+
+def find_anchors_and_corresponding_divs(body, html_dir, markdown_dir, manifest_path=None, force=False,
+                                        executor=None, parser=DEFAULT_PARSER, spec=None, section=None,
+                                        overviews=None, endpoints=None, index=None):
+    """Render the endpoints of the body, or of a prebuilt index, and return the SectionOutput report."""
+    output = SectionOutput(html_dir, markdown_dir, manifest_path, force, spec, section)
+    if index is None:
+        with span('index_endpoint_anchors', section=section):
+            index = index_endpoint_anchors(body)
+    for rendered in render_sources(output.plan(index, endpoints), executor, parser, section):
+        output.write(*rendered)
+    return output.finish(overviews, endpoints)
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def example_endpoint_request(endpoint):
+    """Format the example request of an Endpoint."""
     example_request_md = "\n#### Example Request\n\n"
-    text_wrapper = element.find('div', class_='Copy__TextWrapper-sc-71i6s4-1 bsrJTO')
-    if text_wrapper:
-        request_url = text_wrapper.get_text().strip()
-        example_request_md += f"```\n{request_url.replace('*', '{POLYGON_API_KEY}')}\n```\n"
+    if endpoint.example_request is not None:
+        example_request_md += f"```\n{endpoint.example_request.replace('*', '{POLYGON_API_KEY}')}\n```\n"
     return example_request_md
 
 
-def endpoint_details(element):
-    """Extract and format the endpoint details from the given HTML element."""
-    details_md = "\n### Endpoint\n\n"
-    method_elements = element.find_all('span', class_='base__RequestMethod-sc-127j6tq-1')
-    url_elements = element.find_all('div', class_='Text__StyledText-sc-6aor3p-0')
-    if method_elements and url_elements:
-        methods_urls = zip(method_elements, url_elements)
-        for method_element, url_element in methods_urls:
-            method = method_element.get_text().strip().upper()
-            urls = url_element.find_all('div')
-            if urls:
-                details_md += f"- Method: `{method}`\n"
-                if len(urls) > 1:
-                    details_md += "- Urls:\n"
-                    for url in urls:
-                        label = url.find('label')
-                        if label:
-                            label_text = label.get_text().strip()
-                            url_text = url.get_text().strip().replace(label_text, '').strip()
-                            details_md += f"  - {label_text} `{url_text}`\n"
-                        else:
-                            url_text = url.get_text().strip()
-                            details_md += f"  - `{url_text}`\n"
+def endpoint_details(endpoint):
+    """Format the methods and urls of an Endpoint."""
+    lines = ["\n### Endpoint\n\n"]
+    for endpoint_method in endpoint.methods:
+        lines.append(f"- Method: `{endpoint_method.method}`\n")
+        if len(endpoint_method.urls) > 1:
+            lines.append("- Urls:\n")
+            for url in endpoint_method.urls:
+                if url.label:
+                    lines.append(f"  - {url.label} `{url.url}`\n")
                 else:
-                    url_text = urls[0].get_text().strip()
-                    details_md += f"- Url: `{url_text}`\n"
-            else:
-                # Fallback to the text of the url_element itself if no divs are found
-                url_text = url_element.get_text().strip()
-                details_md += f"- Method: `{method}`\n"
-                details_md += f"- Url: `{url_text}`\n"
-        details_md += "\n"
-    return details_md
-
-
-def endpoint_description(element):
-    """Extract and format the endpoint description from the given HTML element."""
-    description_md = "\n### Description\n\n"
-    description_elements = element.find_all('div', class_='Text__StyledText-sc-6aor3p-0')
-    for desc_element in description_elements:
-        if 'jugoJw' in desc_element.get('class', []):
-            description_md += f"{desc_element.get_text().strip()}\n\n"
+                    lines.append(f"  - `{url.url}`\n")
+        else:
+            lines.append(f"- Url: `{endpoint_method.urls[0].url}`\n")
+    if endpoint.methods:
+        lines.append("\n")
+    return ''.join(lines)
+
+
+def endpoint_description(endpoint):
+    """Format the description of an Endpoint."""
+    description_md = ''.join(["\n### Description\n\n"] + [f"{description}\n\n" for description in endpoint.descriptions])
     return description_md.replace('<br />', '\n').replace('<br>', '\n')
 
 
-def endpoint_response_attributes(element):
-    """Extract and format the response attributes from the given HTML element."""
-    attributes_md = "\n#### Attributes\n\n"
-    attributes_md += "<span style='color: red'>*</span> indicates the attribute is gaurenteed to be returned, otherwise the attribtue may not be returned so ensure your parser can handle these cases.\n\n"
-    attribute_divs = element.find_all('div', class_='ResponseAttributes__OverflowXAuto-sc-hzb6em-0')
-    for attr_div in attribute_divs:
-        name_span = attr_div.find('span', class_='Text__StyledText-sc-6aor3p-0 ggvwlD')
-        type_span = attr_div.find('span', class_='Text__StyledText-sc-6aor3p-0 eelqYu')
-        description_p = attr_div.find('div', class_='ResponseAttributes__Description-sc-hzb6em-1')
-        if name_span and type_span and description_p:
-            name = name_span.get_text().strip()
-            is_required = '*' in name
-            name = name.replace('*', '').strip()
-            required_text = " <span style='color: red'>*</span>" if is_required else ""
-            attr_type = type_span.get_text().strip()
-            description = description_p.get_text().strip()
-            attribute =  f"- **{name}{required_text}** ({attr_type}): {description}\n"
-                # Check if the attribute is already in attributes_md
-            if attribute not in attributes_md:
-                attributes_md += attribute
-            if attr_type.lower() == 'array':
-                # Handle nested structure for array type
-                nested_attrs = attr_div.find_next_sibling('div')
-                if nested_attrs:
-                    nested_attribute_divs = nested_attrs.find_all('div', recursive=False)
-                    for nested_attr_div in nested_attribute_divs:
-                        nested_name_span = nested_attr_div.find('span', class_='Text__StyledText-sc-6aor3p-0 ggvwlD')
-                        nested_type_span = nested_attr_div.find('span', class_='Text__StyledText-sc-6aor3p-0 eelqYu')
-                        nested_description_p = nested_attr_div.find('div', class_='ResponseAttributes__Description-sc-hzb6em-1')
-                        if nested_name_span and nested_type_span and nested_description_p:
-                            nested_name = nested_name_span.get_text().strip()
-                            nested_is_required = '*' in nested_name
-                            nested_name = nested_name.replace('*', '').strip()
-                            nested_required_text = " <span style='color: red'>*</span>" if nested_is_required else ""
-                            nested_attr_type = nested_type_span.get_text().strip()
-                            nested_description = nested_description_p.get_text().strip()
-                            attributes_md += f"  - **{nested_name}{nested_required_text}** ({nested_attr_type}): {nested_description}\n"
-    return attributes_md
-
-
-
-def endpoint_response_object(element):
-    """Extract and format the response object from the given HTML element."""
+def _attribute_line(attribute):
+    required_text = REQUIRED_MARKER if attribute.required else ""
+    return f"- **{attribute.name}{required_text}** ({attribute.type}): {attribute.description}\n"
+
+def endpoint_response_attributes(endpoint):
+    """Format the response attributes of an Endpoint.
+
+    A top level attribute is listed once even if the page repeats it; nested
+    array children are always listed under their parent.
+    """
+    lines = [
+        "\n#### Attributes\n\n",
+        "<span style='color: red'>*</span> indicates the attribute is gaurenteed to be returned, otherwise the attribtue may not be returned so ensure your parser can handle these cases.\n\n",
+    ]
+    seen = set()
+    for attribute in endpoint.attributes:
+        line = _attribute_line(attribute)
+        if line not in seen:
+            seen.add(line)
+            lines.append(line)
+        for child in attribute.children:
+            child_line = _attribute_line(child)
+            seen.add(child_line)
+            lines.append(f"  {child_line}")
+    return ''.join(lines)
+
+
+
+def endpoint_response_object(endpoint):
+    """Format the example response of an Endpoint."""
     response_object_md = "\n#### Example Response\n\n```json\n"
-    pre = element.find('pre')
-    if pre:
-        response_object_md += pre.get_text().strip() + "\n"
+    if endpoint.example_response is not None:
+        response_object_md += endpoint.example_response + "\n"
     response_object_md += "```\n\n"
     return response_object_md
                 
 
-def create_api_overview_markdown(html_dir, markdown_dir):
-    with open(f'{html_dir}/body.html', 'r') as file:
-        full_soup = BeautifulSoup(file.read(), 'html.parser')
-
+def create_api_overview_markdown(body, markdown_dir):
     # Extract the overview section from the full body
-    overview_section = full_soup.find('div', class_='ScrollTrackedSection__ScrollTargetWrapper-sc-1r3wlr6-0')
+    overview_section = body.find('div', class_='ScrollTrackedSection__ScrollTargetWrapper-sc-1r3wlr6-0')
     if not overview_section:
         raise ValueError("Overview section not found in the HTML document.")
 
@@ -329,79 +1163,606 @@ def create_api_overview_markdown(html_dir, markdown_dir):
             api_overview_md += f"{response_description.get_text().strip()}\n\n"
 
     # Write to markdown file in the rest folder
-    with open(f'{markdown_dir}/rest/rest_api_overview.md', 'w') as file:
-        file.write(api_overview_md)
+    write_output(f'{markdown_dir}/rest/rest_api_overview.md', api_overview_md)
+    return api_overview_md
 
 
-def create_modular_reference(output_dir, sections):
-    reference_md = "# Polygon.io API Modular Reference\n\n"
-    reference_md += "## Overview\n\n"
-    reference_md += """
+def reference_manifests(output_dir, sections, manifests=None):
+    """Return {section: manifest} for the sections the modular reference lists, in section order.
+
+    Sections missing from manifests (this run's) are read from disk if their manifest has the current RENDERER_VERSION.
+    """
+    manifests = manifests or {}
+    found = {}
+    for section in sections:
+        manifest = manifests.get(section) or read_recorded_manifest(f'{output_dir}/{section}/manifest.json')
+        if section in manifests or (manifest and manifest.get('renderer_version') == RENDERER_VERSION):
+            found[section] = manifest
+    return found
+
+def create_modular_reference(output_dir, sections, manifests=None):
+    """Write modual_reference.md from the section manifests.
+
+    manifests maps each section to its manifest ({'overviews': ..., 'endpoints': ...}),
+    as recorded while the endpoints were rendered. The sections are chosen by
+    reference_manifests, so a reference-only rebuild never opens the markdown
+    files and skips sections without a current manifest.
+    """
+    lines = [
+        "# Polygon.io API Modular Reference\n\n",
+        "## Overview\n\n",
+        """
 Below you will find reference to all the endpoints available in the Polygon.io API. The reference is broken down into sections based on the asset type and the API type (REST or WebSocket).
 Each endpoint is documented in its own markdown file. 
-"""
-    for section in sections:
-        reference_md += f"## {section.capitalize()}\n"
-        reference_md += "### REST API\n"
-        rest_md_dir = f'{output_dir}/{section}/markdown/rest'
-        rest_md_files = os.listdir(rest_md_dir)
-        # Place the REST API overview file at the top
-        rest_md_files = sorted(rest_md_files, key=lambda x: (x != 'rest_api_overview.md', x))
-        for md_file in rest_md_files:
-            if md_file.endswith('.md'):
-                with open(f'{rest_md_dir}/{md_file}', 'r') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('#'):
-                        # Parse the first line as HTML to extract the text content
-                        soup = BeautifulSoup(first_line, 'html.parser')
-                        display_name = soup.get_text().replace('##', '').strip()
-                    else:
-                        display_name = md_file.replace('_', ' ').replace('.md', '')
-                reference_md += f"- [{display_name}]({section}/markdown/rest/{md_file})\n"
-        reference_md += "\n### WebSocket API\n"
-        websocket_md_dir = f'{output_dir}/{section}/markdown/websocket'
-        websocket_md_files = os.listdir(websocket_md_dir)
-        # Ensure the WebSocket API overview file is at the top
-        for md_file in sorted(websocket_md_files, key=lambda x: (x != 'websocket_api_overview.md', x)):
-            if md_file.endswith('.md'):
-                with open(f'{websocket_md_dir}/{md_file}', 'r') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('#'):
-                        # Parse the first line as HTML to extract the text content
-                        soup = BeautifulSoup(first_line, 'html.parser')
-                        display_name = soup.get_text().replace('##', '').strip()
-                    else:
-                        display_name = md_file.replace('_', ' ').replace('.md', '')
-                reference_md += f"- [{display_name}]({section}/markdown/websocket/{md_file})\n"
-        reference_md += "\n"
-    with open(f'{output_dir}/modual_reference.md', 'w') as file:
-        file.write(reference_md)
+""",
+    ]
+    for section, manifest in reference_manifests(output_dir, sections, manifests).items():
+        overviews = manifest.get('overviews', {})
+        endpoints = manifest_endpoints(manifest)
+        lines.append(f"## {section.capitalize()}\n")
+        for kind, heading in (('rest', "### REST API\n"), ('websocket', "\n### WebSocket API\n")):
+            lines.append(heading)
+            # Place the overview file at the top
+            if kind in overviews:
+                lines.append(f"- [{overviews[kind]}]({section}/markdown/{kind}/{kind}_api_overview.md)\n")
+            entries = sorted((entry for entry in endpoints.values() if entry['kind'] == kind),
+                             key=lambda entry: f"{entry['name']}.md")
+            for entry in entries:
+                lines.append(f"- [{entry['title']}]({section}/markdown/{kind}/{entry['name']}.md)\n")
+        lines.append("\n")
+    write_output(f'{output_dir}/modual_reference.md', ''.join(lines))
 
-if __name__ == '__main__':
-    sections = ['stocks', 'options', 'indices', 'forex', 'crypto']
-    base_url = 'https://polygon.io/docs/{}/getting-started'
+OPENAPI_VERSION = '3.0.3'
+# Polygon attribute types mapped to OpenAPI schema types; anything unknown is a string.
+OPENAPI_TYPES = {'string': 'string', 'integer': 'integer', 'number': 'number', 'boolean': 'boolean',
+                 'object': 'object', 'array': 'array'}
+# Methods that belong in an OpenAPI document; WebSocket channels are left out.
+OPENAPI_METHODS = ('get', 'post', 'put', 'patch', 'delete')
 
-    for section in sections:
-        url = base_url.format(section)
-        output_dir = f'output/{section}'
-        html_dir = f'{output_dir}/html'
-        markdown_dir = f'{output_dir}/markdown'
+def _schema_name(*parts):
+    return ''.join(word.capitalize() for part in parts for word in re.split(r'[^0-9a-zA-Z]+', part) if word)
+
+class OpenApiWriter:
+    """Stream endpoints into an OpenAPI 3.0 JSON document, which replaces path only when close() commits."""
+
+    def __init__(self, path, title='Polygon.io API', version='1.0.0', server='https://api.polygon.io'):
+        self.path = path
+        self.tmp_path = f'{path}.tmp'
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(self.tmp_path, 'w')
+        self.paths = set()
+        self.operation_ids = set()
+        self.schemas = {}
+        self.schema_names = {}
+        header = json.dumps({'openapi': OPENAPI_VERSION, 'info': {'title': title, 'version': version},
+                             'servers': [{'url': server}]}, indent=2)
+        # Leave the object open so paths can be appended one at a time.
+        self.file.write(header[:-2] + ',\n  "paths": {')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        self.close(commit=exc_type is None)
+
+    def _attribute_schema(self, attribute, owner):
+        attr_type = attribute.type.lower()
+        schema = {'type': OPENAPI_TYPES.get(attr_type.split(' ')[0].split('[')[0], 'string')}
+        if attribute.description:
+            schema['description'] = attribute.description
+        if schema['type'] == 'array':
+            schema['items'] = self._object_schema(attribute.children, owner + (attribute.name,)) \
+                if attribute.children else {}
+        return schema
+
+    def _object_schema(self, attributes, owner):
+        properties = {}
+        required = []
+        for attribute in attributes:
+            if attribute.name in properties:
+                continue
+            properties[attribute.name] = self._attribute_schema(attribute, owner)
+            if attribute.required:
+                required.append(attribute.name)
+        schema = {'type': 'object', 'properties': properties}
+        if required:
+            schema['required'] = required
+        if len(owner) < 2:
+            return schema
+        # Array item objects are shared through components/schemas.
+        key = json.dumps(schema, sort_keys=True)
+        name = self.schema_names.get(key)
+        if name is None:
+            base_name = name = _schema_name(*owner)
+            counter = 2
+            while name in self.schemas:
+                name = f'{base_name}{counter}'
+                counter += 1
+            self.schemas[name] = schema
+            self.schema_names[key] = name
+        return {'$ref': f'#/components/schemas/{name}'}
+
+    def _operation_id(self, title, tag):
+        base = sanitize_filename(title).strip('_')
+        operation_id = base
+        if operation_id in self.operation_ids and tag:
+            operation_id = f'{tag}_{base}'
+        counter = 2
+        while operation_id in self.operation_ids:
+            operation_id = f'{base}_{counter}'
+            counter += 1
+        self.operation_ids.add(operation_id)
+        return operation_id
+
+    def add_endpoint(self, title, endpoint, tag=None):
+        """Write a path item for every url of every method of a parsed Endpoint.
+
+        Returns False if none was emitted.
+        """
+        items = {}
+        for endpoint_method in endpoint.methods:
+            method = endpoint_method.method.lower()
+            for url in endpoint_method.urls:
+                # WebSocket channels have no place in the spec, and reference endpoints
+                # repeated across sections are only emitted once.
+                if method in OPENAPI_METHODS and url.url.startswith('/') and url.url not in self.paths:
+                    items.setdefault(url.url, {}).setdefault(method, url)
+        if not items:
+            return False
+
+        response = {'description': 'OK'}
+        if endpoint.attributes:
+            content = {'schema': self._object_schema(endpoint.attributes, (title,))}
+            if endpoint.example_response:
+                try:
+                    content['example'] = json.loads(endpoint.example_response)
+                except ValueError:
+                    pass
+            response['content'] = {'application/json': content}
+
+        for path, methods in items.items():
+            operations = {method: self._operation(title, endpoint, path, url.label, response, tag)
+                          for method, url in methods.items()}
+            self.paths.add(path)
+            separator = ',' if len(self.paths) > 1 else ''
+            self.file.write(f'{separator}\n    {json.dumps(path)}: {json.dumps(operations)}')
+        return True
+
+    def _operation(self, title, endpoint, path, label, response, tag):
+        parameters = []
+        for param in endpoint.parameters:
+            in_path = f'{{{param.name}}}' in path
+            parameter = {'name': param.name, 'in': 'path' if in_path else 'query',
+                         'required': in_path or param.required, 'schema': {'type': 'string'}}
+            if param.options:
+                parameter['schema']['enum'] = param.options
+            if param.description:
+                parameter['description'] = param.description
+            parameters.append(parameter)
+        # Every templated path segment must be declared, even if the page does not list it.
+        declared = {param.name for param in endpoint.parameters}
+        for name in re.findall(r'{([^}]+)}', path):
+            if name not in declared:
+                parameters.append({'name': name, 'in': 'path', 'required': True, 'schema': {'type': 'string'}})
+
+        # Alternative urls of one endpoint are told apart by their label on the page.
+        summary = f"{title} ({label.rstrip(':').strip()})" if label else title
+        operation = {'operationId': self._operation_id(summary, tag), 'summary': summary}
+        if endpoint.descriptions:
+            operation['description'] = '\n\n'.join(endpoint.descriptions)
+        if tag:
+            operation['tags'] = [tag]
+        if parameters:
+            operation['parameters'] = parameters
+        operation['responses'] = {'200': response}
+        return operation
+
+    def close(self, commit=True):
+        """Finish the document and move it into place, or discard it when commit is false."""
+        if self.file.closed:
+            return
+        if not commit:
+            self.file.close()
+            _remove_file(self.tmp_path)
+            return
+        components = json.dumps({'schemas': self.schemas})
+        self.file.write(f'\n  }},\n  "components": {components}\n}}\n')
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+def process_section(soup, output_dir, incremental=True, executor=None, parser=DEFAULT_PARSER, spec=None,
+                    section=None):
+    """Render the overviews and every endpoint of one parsed section page.
+
+    Returns the report from find_anchors_and_corresponding_divs, with the
+    overview titles added under 'overviews'.
+    With incremental=False every endpoint is regenerated regardless of the manifest.
+    An executor, if given, is used to render endpoints in worker processes, and
+    a spec (OpenApiWriter) receives every endpoint tagged with the section name.
+    """
+    html_dir = f'{output_dir}/html'
+    markdown_dir = f'{output_dir}/markdown'
+
+    # Directories are created by the writer as files land in them.
+    with span('remove_first_nav_element', section=section):
+        remove_first_nav_element(soup)
+    with span('extract_and_save_main_nav', section=section):
+        extract_and_save_main_nav(soup, html_dir)
+    # Parse once: every extractor shares the in-memory body subtree.
+    with span('extract_and_save_main_content', section=section):
+        body = extract_and_save_main_content(soup, html_dir)
+    if body is None:
+        raise ValueError("Main content not found in the HTML document.")
+    overviews = section_overviews(body, markdown_dir, section)
+    with span('find_anchors_and_corresponding_divs', section=section):
+        report = find_anchors_and_corresponding_divs(body, html_dir, markdown_dir,
+                                                     manifest_path=f'{output_dir}/manifest.json',
+                                                     force=not incremental, executor=executor, parser=parser,
+                                                     spec=spec, section=section, overviews=overviews)
+    report['overviews'] = overviews
+    return report
+
+def section_overviews(body, markdown_dir, section=None):
+    """Write both overview documents and return their titles for the manifest."""
+    with span('create_api_overview_markdown', section=section):
+        rest_overview = create_api_overview_markdown(body, markdown_dir)
+    with span('create_websocket_api_overview_markdown', section=section):
+        websocket_overview = create_websocket_api_overview_markdown(body, markdown_dir)
+    return {
+        'rest': reference_title(rest_overview, 'rest_api_overview.md'),
+        'websocket': reference_title(websocket_overview, 'websocket_api_overview.md'),
+    }
+
+def process_section_low_memory(html_text, output_dir, incremental=True, executor=None, parser=DEFAULT_PARSER,
+                               spec=None, section=None):
+    """process_section for a raw page, holding at most one endpoint container as a tree at a time.
 
-        #Ensure the directories are created.
-        os.makedirs(html_dir, exist_ok=True)
-        os.makedirs(markdown_dir, exist_ok=True)
-        os.makedirs(f'{markdown_dir}/rest', exist_ok=True)
-        os.makedirs(f'{markdown_dir}/websocket', exist_ok=True)
+    Writes the same files as process_section except body.html, and falls back to it when the scan misses an endpoint.
+    """
+    html_dir = f'{output_dir}/html'
+    markdown_dir = f'{output_dir}/markdown'
 
+    with span('scan_endpoint_anchors', section=section):
+        spans = _outermost_spans((start, end) for _, _, start, end in scan_endpoint_anchors(html_text))
+    parts = []
+    position = 0
+    for start, end in spans:
+        parts.append(html_text[position:start])
+        position = end
+    parts.append(html_text[position:])
+    with span('make_soup', section=section):
+        soup = make_soup(''.join(parts), parser, parse_only=PAGE_REGIONS)
+    del parts
+    with span('index_endpoint_anchors', section=section):
+        missed = index_endpoint_anchors(soup)
+    if missed:
+        print(f"{section or output_dir}: the endpoint scan missed {len(missed)} endpoint(s), parsing the whole page",
+              file=sys.stderr)
+        soup.decompose()
+        with span('make_soup', section=section):
+            soup = make_soup(html_text, parser)
+        return process_section(soup, output_dir, incremental=incremental, executor=executor, parser=parser,
+                               spec=spec, section=section)
 
-        soup = parse_html_document(url)
+    with span('remove_first_nav_element', section=section):
         remove_first_nav_element(soup)
+    with span('extract_and_save_main_nav', section=section):
         extract_and_save_main_nav(soup, html_dir)
-        extract_and_save_main_content(soup, html_dir)
-        create_api_overview_markdown(html_dir,markdown_dir)
-        create_websocket_api_overview_markdown(html_dir, markdown_dir)
-        find_anchors_and_corresponding_divs(html_dir, markdown_dir)
-    
-    create_modular_reference('output', sections)
+    with span('extract_and_save_main_content', section=section):
+        body = soup.find('div')
+        if body is None:
+            raise ValueError("Main content not found in the HTML document.")
+        body.extract()
+        soup.decompose()
+    overviews = section_overviews(body, markdown_dir, section)
+    body.decompose()
+    remove_output(f'{html_dir}/body.html')
 
+    with span('find_anchors_and_corresponding_divs', section=section):
+        report = find_anchors_and_corresponding_divs(None, html_dir, markdown_dir,
+                                                     manifest_path=f'{output_dir}/manifest.json',
+                                                     force=not incremental, executor=executor, parser=parser,
+                                                     spec=spec, section=section, overviews=overviews,
+                                                     index=iter_endpoint_fragments(html_text, spans, parser))
+    report['overviews'] = overviews
+    return report
 
+def _outermost_spans(spans):
+    """Sort (start, end) spans and drop duplicates and spans nested in an earlier one."""
+    outermost = []
+    covered = -1
+    for start, end in sorted(set(spans)):
+        if start >= covered:
+            outermost.append((start, end))
+            covered = end
+    return outermost
+
+def iter_endpoint_fragments(html_text, spans, parser=DEFAULT_PARSER):
+    """Yield index_endpoint_anchors entries for each container span, parsing one span at a time.
+
+    A span's tree is decomposed once the consumer asks for the entry after its
+    last one.
+    """
+    for start, end in spans:
+        fragment = make_soup(f'<div>{html_text[start:end]}</div>', parser).div
+        yield from index_endpoint_anchors(fragment)
+        fragment.decompose()
+
+def filtered_run_manifest(manifest_path):
+    """Return the manifest a filtered run builds on, which must be current so no recorded endpoint is lost."""
+    manifest = read_recorded_manifest(manifest_path)
+    if manifest is None or manifest.get('renderer_version') != RENDERER_VERSION:
+        raise ValueError(f"{manifest_path} is missing or was written by another renderer version; "
+                         "run without endpoint filters first.")
+    return manifest
+
+def process_section_endpoints(html_text, output_dir, endpoints, incremental=True, executor=None,
+                              parser=DEFAULT_PARSER, spec=None, section=None, low_memory=False):
+    """Render only the endpoints matching the name or glob patterns in endpoints.
+
+    The raw page is scanned for endpoint containers and only the matching ones
+    are parsed, so the overviews, sidebar and body.html are left untouched.
+    Returns the same report as process_section.
+    """
+    manifest_path = f'{output_dir}/manifest.json'
+    overviews = filtered_run_manifest(manifest_path).get('overviews', {})
+    with span('scan_endpoint_anchors', section=section):
+        spans = _outermost_spans((start, end) for name, _, start, end in scan_endpoint_anchors(html_text)
+                                 if endpoint_matches(sanitize_filename(f"{name}_endpoint"), endpoints))
+    if low_memory:
+        body, index = None, iter_endpoint_fragments(html_text, spans, parser)
+    else:
+        with span('make_soup', section=section):
+            fragments = ''.join(html_text[start:end] for start, end in spans)
+            body, index = make_soup(f"<div>{fragments}</div>", parser).div, None
+    with span('find_anchors_and_corresponding_divs', section=section):
+        report = find_anchors_and_corresponding_divs(body, f'{output_dir}/html', f'{output_dir}/markdown',
+                                                     manifest_path=manifest_path, force=not incremental,
+                                                     executor=executor, parser=parser, spec=spec,
+                                                     section=section, overviews=overviews,
+                                                     endpoints=endpoints, index=index)
+    report['overviews'] = overviews
+    return report
+
+def format_report(section, report):
+    summary = f"{section}: {len(report['added'])} added, {len(report['changed'])} changed, " \
+              f"{len(report['removed'])} removed, {len(report['unchanged'])} unchanged"
+    details = [f"  {label} {name}" for label, key in (('+', 'added'), ('~', 'changed'), ('-', 'removed'))
+               for name in report[key]]
+    return '\n'.join([summary] + details)
+
+def run(sections, output_root='output', concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+        retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, cache_dir=DEFAULT_CACHE_DIR, offline=False,
+        incremental=True, parser=DEFAULT_PARSER, workers=DEFAULT_WORKERS, openapi_path=None, profile=False,
+        archive=None, write_queue_size=DEFAULT_WRITE_QUEUE_SIZE, endpoints=None, low_memory=False):
+    """Fetch the sections concurrently and process them in order, writing through a BackgroundWriter.
+
+    The options mirror the command line flags (see parse_args). An archive is
+    rebuilt in full and, like the OpenAPI document, only replaces the previous
+    one when the run succeeds.
+    """
+    global PROFILER, WRITER
+    if archive and endpoints:
+        raise ValueError("Endpoint filters cannot be combined with an archive, which is rebuilt in full.")
+    if openapi_path and endpoints:
+        raise ValueError("Endpoint filters cannot be combined with an OpenAPI document, which must list every endpoint.")
+    if endpoints:
+        for section in sections:
+            filtered_run_manifest(f'{output_root}/{section}/manifest.json')
+    if archive:
+        incremental = False
+    sink = create_archive_writer(archive, output_root) if archive else DirectoryWriter()
+    WRITER = BackgroundWriter(sink, max_pending=write_queue_size)
+    PROFILER = Profiler() if profile else None
+    completed = False
+    try:
+        _run_sections(sections, output_root, concurrency, timeout, retries, backoff, cache_dir, offline,
+                      incremental, parser, workers, openapi_path, endpoints, low_memory)
+        completed = True
+    finally:
+        # A failed run must not replace a previous archive with a partial one,
+        # nor leave profiling switched on for the rest of the process.
+        profiler, PROFILER = PROFILER, None
+        writer, WRITER = WRITER, None
+        writer.close(commit=completed)
+
+    if profiler is not None:
+        profiler.write_trace(f'{output_root}/profile_trace.json')
+        print(profiler.summary())
+
+def _run_sections(sections, output_root, concurrency, timeout, retries, backoff, cache_dir, offline,
+                  incremental, parser, workers, openapi_path, endpoints=None, low_memory=False):
+    """Fetch and process every section; run() owns the profiler and writer around this."""
+    def fetch(section):
+        with span('fetch_html_document', section=section):
+            return fetch_html_document(BASE_URL.format(section), session, timeout, cache_dir, offline,
+                                       stream=low_memory)
+
+    # Offline runs replay the cache and never need a session (or the requests import).
+    session = None if offline else create_session(pool_size=concurrency, retries=retries, backoff=backoff)
+    render_executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        render_executor = ProcessPoolExecutor(max_workers=workers)
+    spec = OpenApiWriter(openapi_path) if openapi_path else None
+    manifests = {}
+    # The spec only replaces the previous one when every section went through.
+    with session or nullcontext(), render_executor or nullcontext(), spec or nullcontext(), \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Low-memory runs keep only a few pages in flight; otherwise every fetch starts at once.
+        upcoming = iter(sections)
+        pending = deque((section, executor.submit(fetch, section)) for section in
+                        itertools.islice(upcoming, 1 + LOW_MEMORY_PREFETCH if low_memory else len(sections)))
+        # Sections are processed in the order given, not the order their fetches finish:
+        # endpoints shared between sections go into the spec under the first section.
+        while pending:
+            section, future = pending.popleft()
+            # Drop the future so the page text is freed once this section is done with it.
+            html_text = future.result()
+            del future
+            output_dir = f'{output_root}/{section}'
+            if endpoints:
+                report = process_section_endpoints(html_text, output_dir, endpoints, incremental=incremental,
+                                                   executor=render_executor, parser=parser, spec=spec,
+                                                   section=section, low_memory=low_memory)
+            elif low_memory:
+                report = process_section_low_memory(html_text, output_dir, incremental=incremental,
+                                                    executor=render_executor, parser=parser, spec=spec,
+                                                    section=section)
+            else:
+                with span('make_soup', section=section):
+                    soup = make_soup(html_text, parser)
+                report = process_section(soup, output_dir, incremental=incremental,
+                                         executor=render_executor, parser=parser, spec=spec, section=section)
+                del soup
+            del html_text
+            next_section = next(upcoming, None)
+            if next_section is not None:
+                pending.append((next_section, executor.submit(fetch, next_section)))
+            manifests[section] = {'overviews': report['overviews'], 'endpoints': report['endpoints']}
+            print(format_report(section, report))
+
+    # Sections rendered by earlier runs stay in the reference when only some are selected,
+    # unless the output is an archive, which only holds this run's sections.
+    with span('create_modular_reference'):
+        create_modular_reference(output_root, SECTIONS + [section for section in sections if section not in SECTIONS],
+                                 manifests)
+
+def check_parser_parity(html_text, backends=PARSER_BACKENDS):
+    """Render one recorded page with every backend and return the markdown files that differ.
+
+    The first backend is the reference; the result maps each other backend to
+    the relative paths whose bytes do not match it.
+    """
+    workdir = tempfile.mkdtemp(prefix='parser-parity-')
+    try:
+        for backend in backends:
+            process_section(make_soup(html_text, backend), f'{workdir}/{backend}', incremental=False)
+        reference_dir = f'{workdir}/{backends[0]}/markdown'
+        mismatches = {}
+        for backend in backends[1:]:
+            backend_dir = f'{workdir}/{backend}/markdown'
+            differing = []
+            for kind in ('rest', 'websocket'):
+                names = set(os.listdir(f'{reference_dir}/{kind}')) | set(os.listdir(f'{backend_dir}/{kind}'))
+                for name in sorted(names):
+                    paths = (f'{reference_dir}/{kind}/{name}', f'{backend_dir}/{kind}/{name}')
+                    contents = []
+                    for path in paths:
+                        try:
+                            with open(path, 'rb') as file:
+                                contents.append(file.read())
+                        except FileNotFoundError:
+                            contents.append(None)
+                    if contents[0] != contents[1]:
+                        differing.append(f'{kind}/{name}')
+            mismatches[backend] = differing
+        return mismatches
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def check_cached_parser_parity(sections, cache_dir=DEFAULT_CACHE_DIR, backends=PARSER_BACKENDS):
+    """Run check_parser_parity over the recorded copies of each section page.
+
+    Returns False if any backend differs, and also if no section had a recorded
+    page, so an empty cache never passes as a successful check.
+    """
+    ok = True
+    compared = 0
+    for section in sections:
+        url = BASE_URL.format(section)
+        _, html_text = load_cached_document(cache_dir, url)
+        if html_text is None:
+            print(f"{section}: no recorded page in {cache_dir}, skipped")
+            continue
+        compared += 1
+        for backend, differing in check_parser_parity(html_text, backends).items():
+            if differing:
+                ok = False
+                print(f"{section}: {backend} differs from {backends[0]} in {len(differing)} file(s)")
+                for path in differing:
+                    print(f"  {path}")
+            else:
+                print(f"{section}: {backend} matches {backends[0]}")
+    if not compared:
+        print(f"No recorded pages in {cache_dir}; run once without --offline to record them.")
+        return False
+    return ok
+
+def list_endpoints(sections, patterns=None, timeout=DEFAULT_TIMEOUT, cache_dir=DEFAULT_CACHE_DIR, offline=False):
+    """Print the endpoint file names (and anchors) of each section page, optionally filtered by patterns."""
+    session = None if offline else create_session(pool_size=1)
+    with session or nullcontext():
+        for section in sections:
+            html_text = fetch_html_document(BASE_URL.format(section), session, timeout, cache_dir, offline)
+            for name, href, _, _ in scan_endpoint_anchors(html_text):
+                endpoint_file_name = sanitize_filename(f"{name}_endpoint")
+                if not patterns or endpoint_matches(endpoint_file_name, patterns):
+                    print(f"{section}\t{endpoint_file_name}\t{href}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Convert the Polygon.io API documentation to markdown.')
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=SECTIONS, metavar='SECTION',
+                        help=f"Sections to convert (default: all of {', '.join(SECTIONS)}).")
+    parser.add_argument('--endpoints', nargs='+', metavar='PATTERN',
+                        help='Only render endpoints whose file name matches one of these names or globs, '
+                             'e.g. aggregates_bars or "trades*". Other output is left as it is; '
+                             'the sections need a manifest from a full run with this version.')
+    parser.add_argument('--list-endpoints', action='store_true',
+                        help='Print the endpoint names of the selected sections and exit.')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Number of section pages to download at the same time.')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='Per-request timeout in seconds.')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='Retries for failed or throttled requests.')
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF,
+                        help='Exponential backoff factor between retries, in seconds.')
+    parser.add_argument('--output', default='output', help='Root output directory.')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Directory for the on-disk HTTP cache.')
+    parser.add_argument('--no-cache', action='store_true', help='Always download pages in full.')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay cached pages without any network access.')
+    parser.add_argument('--force', action='store_true',
+                        help='Regenerate every endpoint even if its source is unchanged.')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                        help='HTML parser backend used to build the document tree.')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Worker processes used to render the endpoints of a section (1 renders in-process).')
+    parser.add_argument('--openapi', metavar='PATH',
+                        help='Also write an OpenAPI 3.0 (JSON) document of the REST endpoints to PATH. '
+                             'It is written as its own file, also with --archive.')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time every stage and endpoint and write a Chrome trace to OUTPUT/profile_trace.json.')
+    parser.add_argument('--low-memory', action='store_true',
+                        help='Stream pages, parse only their nav and main content, and free endpoints once written. '
+                             'The html/body.html debug copy is not written.')
+    parser.add_argument('--archive', metavar='PATH',
+                        help='Write all output into one .tar, .tar.gz or .sqlite artifact instead of a directory tree.')
+    parser.add_argument('--reference-only', action='store_true',
+                        help='Only rebuild modual_reference.md from the saved section manifests.')
+    parser.add_argument('--check-parity', action='store_true',
+                        help='Render the cached pages with every parser backend and report any markdown differences.')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.check_parity:
+        raise SystemExit(0 if check_cached_parser_parity(args.sections, cache_dir=args.cache_dir) else 1)
+    if args.reference_only:
+        create_modular_reference(args.output, args.sections)
+        raise SystemExit(0)
+    if args.list_endpoints:
+        list_endpoints(args.sections, args.endpoints, timeout=args.timeout,
+                       cache_dir=None if args.no_cache else args.cache_dir, offline=args.offline)
+        raise SystemExit(0)
+    try:
+        run(args.sections, output_root=args.output, concurrency=args.concurrency, timeout=args.timeout,
+            retries=args.retries, backoff=args.backoff,
+            cache_dir=None if args.no_cache else args.cache_dir, offline=args.offline,
+            incremental=not args.force, parser=args.parser, workers=args.workers,
+            openapi_path=args.openapi, profile=args.profile, archive=args.archive, endpoints=args.endpoints,
+            low_memory=args.low_memory)
+    except ValueError as error:
+        raise SystemExit(f"error: {error}")
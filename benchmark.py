@@ -0,0 +1,443 @@
+# Offline benchmark for the documentation pipeline in app.py.
+#
+# The benchmark runs every stage of the pipeline against recorded copies of the section pages, so no
+# network access is needed and results are comparable between runs. The checked-in fixtures/ are
+# distinct synthetic pages with the markup and size of the live docs (127 endpoints over the five
+# sections, built by --synthesize), so the benchmark runs from a clean checkout; --record replaces
+# them with real snapshots:
+#
+#   python benchmark.py                          # run the benchmark on fixtures/
+#   python benchmark.py --record                 # snapshot the live pages into fixtures/ (needs network)
+#   python benchmark.py --synthesize             # rebuild the synthetic pages in fixtures/
+#   python benchmark.py --output results.json    # run the benchmark and save machine readable results
+#   python benchmark.py --compare results.json   # run again and report regressions against a saved run
+import argparse
+import html
+import json
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import bs4
+
+import app
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_REPEATS = 3
+DEFAULT_THRESHOLD = 0.10
+STAGES = ('make_soup', 'extract', 'find_anchors_and_corresponding_divs', 'create_modular_reference')
+
+def fixture_path(fixtures_dir, section):
+    return f'{fixtures_dir}/{section}.html'
+
+def record_fixtures(fixtures_dir, sections, cache_dir=app.DEFAULT_CACHE_DIR):
+    """Download the current section pages and store them as benchmark fixtures."""
+    os.makedirs(fixtures_dir, exist_ok=True)
+    session = app.create_session()
+    with session:
+        for section in sections:
+            html_text = app.fetch_html_document(app.BASE_URL.format(section), session, cache_dir=cache_dir)
+            with open(fixture_path(fixtures_dir, section), 'w') as file:
+                file.write(html_text)
+            print(f"recorded {section} ({len(html_text)} bytes)")
+
+# Endpoint catalogue of each section page: (title, REST path or None for a WebSocket channel).
+SYNTHETIC_CATALOGUE = {
+    'stocks': [
+        ('Aggregates (Bars)', '/v2/aggs/ticker/{stocksTicker}/range/{multiplier}/{timespan}/{from}/{to}'),
+        ('Grouped Daily (Bars)', '/v2/aggs/grouped/locale/us/market/stocks/{date}'),
+        ('Daily Open/Close', '/v1/open-close/{stocksTicker}/{date}'),
+        ('Previous Close', '/v2/aggs/ticker/{stocksTicker}/prev'),
+        ('Trades', '/v3/trades/{stockTicker}'),
+        ('Last Trade', '/v2/last/trade/{stocksTicker}'),
+        ('Quotes (NBBO)', '/v3/quotes/{stockTicker}'),
+        ('Last Quote', '/v2/last/nbbo/{stocksTicker}'),
+        ('All Tickers', '/v2/snapshot/locale/us/markets/stocks/tickers'),
+        ('Gainers/Losers', '/v2/snapshot/locale/us/markets/stocks/{direction}'),
+        ('Ticker', '/v2/snapshot/locale/us/markets/stocks/tickers/{stocksTicker}'),
+        ('Universal Snapshot', '/v3/snapshot'),
+        ('Simple Moving Average (SMA)', '/v1/indicators/sma/{stockTicker}'),
+        ('Exponential Moving Average (EMA)', '/v1/indicators/ema/{stockTicker}'),
+        ('Moving Average Convergence/Divergence (MACD)', '/v1/indicators/macd/{stockTicker}'),
+        ('Relative Strength Index (RSI)', '/v1/indicators/rsi/{stockTicker}'),
+        ('Tickers', '/v3/reference/tickers'),
+        ('Ticker Details v3', '/v3/reference/tickers/{ticker}'),
+        ('Ticker Events', '/vX/reference/tickers/{id}/events'),
+        ('Ticker News', '/v2/reference/news'),
+        ('Ticker Types', '/v3/reference/tickers/types'),
+        ('Market Holidays', '/v1/marketstatus/upcoming'),
+        ('Market Status', '/v1/marketstatus/now'),
+        ('Stock Splits v3', '/v3/reference/splits'),
+        ('Dividends v3', '/v3/reference/dividends'),
+        ('Stock Financials vX', '/vX/reference/financials'),
+        ('Conditions', '/v3/reference/conditions'),
+        ('Exchanges', '/v3/reference/exchanges'),
+        ('Related Tickers', '/v1/related-companies/{ticker}'),
+        ('Aggregates (Per Minute)', None),
+        ('Aggregates (Per Second)', None),
+        ('Trades', None),
+        ('Quotes', None),
+        ('Limit Up - Limit Down (LULD)', None),
+        ('Imbalances', None),
+        ('Fair Market Value', None),
+    ],
+    'options': [
+        ('Aggregates (Bars)', '/v2/aggs/ticker/{optionsTicker}/range/{multiplier}/{timespan}/{from}/{to}'),
+        ('Daily Open/Close', '/v1/open-close/{optionsTicker}/{date}'),
+        ('Previous Close', '/v2/aggs/ticker/{optionsTicker}/prev'),
+        ('Trades', '/v3/trades/{optionsTicker}'),
+        ('Last Trade', '/v2/last/trade/{optionsTicker}'),
+        ('Quotes', '/v3/quotes/{optionsTicker}'),
+        ('Option Contract', '/v3/snapshot/options/{underlyingAsset}/{optionContract}'),
+        ('Options Chain', '/v3/snapshot/options/{underlyingAsset}'),
+        ('Universal Snapshot', '/v3/snapshot'),
+        ('Simple Moving Average (SMA)', '/v1/indicators/sma/{optionsTicker}'),
+        ('Exponential Moving Average (EMA)', '/v1/indicators/ema/{optionsTicker}'),
+        ('Moving Average Convergence/Divergence (MACD)', '/v1/indicators/macd/{optionsTicker}'),
+        ('Relative Strength Index (RSI)', '/v1/indicators/rsi/{optionsTicker}'),
+        ('Options Contract', '/v3/reference/options/contracts/{options_ticker}'),
+        ('All Contracts', '/v3/reference/options/contracts'),
+        ('Tickers', '/v3/reference/tickers'),
+        ('Ticker Details v3', '/v3/reference/tickers/{ticker}'),
+        ('Market Holidays', '/v1/marketstatus/upcoming'),
+        ('Market Status', '/v1/marketstatus/now'),
+        ('Conditions', '/v3/reference/conditions'),
+        ('Exchanges', '/v3/reference/exchanges'),
+        ('Aggregates (Per Minute)', None),
+        ('Aggregates (Per Second)', None),
+        ('Trades', None),
+        ('Quotes', None),
+        ('Fair Market Value', None),
+    ],
+    'indices': [
+        ('Aggregates (Bars)', '/v2/aggs/ticker/{indicesTicker}/range/{multiplier}/{timespan}/{from}/{to}'),
+        ('Previous Close', '/v2/aggs/ticker/{indicesTicker}/prev'),
+        ('Daily Open/Close', '/v1/open-close/{indicesTicker}/{date}'),
+        ('Indices Snapshot', '/v3/snapshot/indices'),
+        ('Universal Snapshot', '/v3/snapshot'),
+        ('Simple Moving Average (SMA)', '/v1/indicators/sma/{indicesTicker}'),
+        ('Exponential Moving Average (EMA)', '/v1/indicators/ema/{indicesTicker}'),
+        ('Moving Average Convergence/Divergence (MACD)', '/v1/indicators/macd/{indicesTicker}'),
+        ('Relative Strength Index (RSI)', '/v1/indicators/rsi/{indicesTicker}'),
+        ('Tickers', '/v3/reference/tickers'),
+        ('Ticker Types', '/v3/reference/tickers/types'),
+        ('Market Holidays', '/v1/marketstatus/upcoming'),
+        ('Market Status', '/v1/marketstatus/now'),
+        ('Aggregates (Per Minute)', None),
+        ('Aggregates (Per Second)', None),
+        ('Value', None),
+    ],
+    'forex': [
+        ('Aggregates (Bars)', '/v2/aggs/ticker/{forexTicker}/range/{multiplier}/{timespan}/{from}/{to}'),
+        ('Grouped Daily (Bars)', '/v2/aggs/grouped/locale/global/market/fx/{date}'),
+        ('Previous Close', '/v2/aggs/ticker/{forexTicker}/prev'),
+        ('Quotes (BBO)', '/v3/quotes/{fxTicker}'),
+        ('Last Quote for a Currency Pair', '/v1/last_quote/currencies/{from}/{to}'),
+        ('Real-time Currency Conversion', '/v1/conversion/{from}/{to}'),
+        ('All Tickers', '/v2/snapshot/locale/global/markets/forex/tickers'),
+        ('Gainers/Losers', '/v2/snapshot/locale/global/markets/forex/{direction}'),
+        ('Ticker', '/v2/snapshot/locale/global/markets/forex/tickers/{ticker}'),
+        ('Universal Snapshot', '/v3/snapshot'),
+        ('Simple Moving Average (SMA)', '/v1/indicators/sma/{fxTicker}'),
+        ('Exponential Moving Average (EMA)', '/v1/indicators/ema/{fxTicker}'),
+        ('Moving Average Convergence/Divergence (MACD)', '/v1/indicators/macd/{fxTicker}'),
+        ('Relative Strength Index (RSI)', '/v1/indicators/rsi/{fxTicker}'),
+        ('Tickers', '/v3/reference/tickers'),
+        ('Market Holidays', '/v1/marketstatus/upcoming'),
+        ('Market Status', '/v1/marketstatus/now'),
+        ('Conditions', '/v3/reference/conditions'),
+        ('Exchanges', '/v3/reference/exchanges'),
+        ('Aggregates (Per Minute)', None),
+        ('Aggregates (Per Second)', None),
+        ('Quotes', None),
+        ('Fair Market Value', None),
+    ],
+    'crypto': [
+        ('Aggregates (Bars)', '/v2/aggs/ticker/{cryptoTicker}/range/{multiplier}/{timespan}/{from}/{to}'),
+        ('Grouped Daily (Bars)', '/v2/aggs/grouped/locale/global/market/crypto/{date}'),
+        ('Daily Open/Close', '/v1/open-close/crypto/{from}/{to}/{date}'),
+        ('Previous Close', '/v2/aggs/ticker/{cryptoTicker}/prev'),
+        ('Trades', '/v3/trades/{cryptoTicker}'),
+        ('Last Trade for a Crypto Pair', '/v1/last/crypto/{from}/{to}'),
+        ('All Tickers', '/v2/snapshot/locale/global/markets/crypto/tickers'),
+        ('Gainers/Losers', '/v2/snapshot/locale/global/markets/crypto/{direction}'),
+        ('Ticker', '/v2/snapshot/locale/global/markets/crypto/tickers/{ticker}'),
+        ('Ticker Full Book (L2)', '/v2/snapshot/locale/global/markets/crypto/tickers/{ticker}/book'),
+        ('Universal Snapshot', '/v3/snapshot'),
+        ('Simple Moving Average (SMA)', '/v1/indicators/sma/{cryptoTicker}'),
+        ('Exponential Moving Average (EMA)', '/v1/indicators/ema/{cryptoTicker}'),
+        ('Moving Average Convergence/Divergence (MACD)', '/v1/indicators/macd/{cryptoTicker}'),
+        ('Relative Strength Index (RSI)', '/v1/indicators/rsi/{cryptoTicker}'),
+        ('Tickers', '/v3/reference/tickers'),
+        ('Market Holidays', '/v1/marketstatus/upcoming'),
+        ('Market Status', '/v1/marketstatus/now'),
+        ('Conditions', '/v3/reference/conditions'),
+        ('Exchanges', '/v3/reference/exchanges'),
+        ('Aggregates (Per Minute)', None),
+        ('Aggregates (Per Second)', None),
+        ('Trades', None),
+        ('Quotes', None),
+        ('Level 2 Book', None),
+        ('Fair Market Value', None),
+    ],
+}
+SYNTHETIC_WORDS = ('the', 'ticker', 'price', 'volume', 'window', 'timestamp', 'market', 'exchange', 'trade', 'quote',
+                   'aggregate', 'results', 'range', 'request', 'response', 'value', 'sorted', 'limit', 'filter')
+SYNTHETIC_TYPES = ('string', 'integer', 'number', 'boolean', 'object')
+
+def _synthetic_sentence(rng, words):
+    return ' '.join(rng.choice(SYNTHETIC_WORDS) for _ in range(words)).capitalize() + '.'
+
+def _synthetic_attribute(name, attr_type, description, required=False):
+    return (f'<div class="ResponseAttributes__OverflowXAuto-sc-hzb6em-0 q">'
+            f'<span class="Text__StyledText-sc-6aor3p-0 ggvwlD">{name}{"*" if required else ""}</span>'
+            f'<span class="Text__StyledText-sc-6aor3p-0 eelqYu">{attr_type}</span>'
+            f'<div class="ResponseAttributes__Description-sc-hzb6em-1 r">{description}</div></div>')
+
+def _synthetic_endpoint(rng, section, index, title, path):
+    """One endpoint container in the markup of the live docs, sized and shaped like a real one."""
+    anchor_id = f"{'get' if path else 'ws'}_{re.sub(r'[^a-z0-9]+', '_', title.lower()).strip('_')}_{index}"
+    if path:
+        method = 'get'
+        urls = f'<div>{html.escape(path)}</div>'
+    else:
+        method = 'ws'
+        urls = (f'<div><label>Realtime:</label>wss://socket.polygon.io/{section}</div>'
+                f'<div><label>Delayed:</label>wss://delayed.polygon.io/{section}</div>')
+    params = []
+    for param in range(rng.randint(4, 14)):
+        name = f'{rng.choice(SYNTHETIC_WORDS)}_{param}'
+        required = '<span>*</span>' if rng.random() < 0.3 else ''
+        options = ''.join(f'<li>{option}</li>' for option in rng.sample(SYNTHETIC_WORDS, rng.randint(2, 6))) \
+            if rng.random() < 0.3 else ''
+        params.append(f'<div class="Parameters__Row"><div class="Parameters__MaxWidth-sc-ize944-0 x">'
+                      f'<label>{name}{required}</label>{f"<menu>{options}</menu>" if options else ""}</div>'
+                      f'<div class="Parameters__Description-sc-ize944-1 y">{_synthetic_sentence(rng, rng.randint(8, 30))} '
+                      f'See <a href="/docs/{section}/{name}">{name}</a> for ‘{name}’.</div></div>')
+    attributes = []
+    for attribute in range(rng.randint(4, 16)):
+        name = f'{rng.choice(SYNTHETIC_WORDS)}{attribute}'
+        if rng.random() < 0.2:
+            nested = ''.join(f'<div>{_synthetic_attribute(f"{name}_{child}", rng.choice(SYNTHETIC_TYPES), _synthetic_sentence(rng, rng.randint(4, 16)), rng.random() < 0.5)}</div>'
+                             for child in range(rng.randint(3, 12)))
+            attributes.append(f'<div class="Wrap">{_synthetic_attribute(name, "array", _synthetic_sentence(rng, 10))}'
+                              f'<div class="Nested">{nested}</div></div>')
+        else:
+            attributes.append(_synthetic_attribute(name, rng.choice(SYNTHETIC_TYPES),
+                                                   _synthetic_sentence(rng, rng.randint(4, 20)), rng.random() < 0.4))
+    response = json.dumps({'status': 'OK', 'request_id': f'{rng.getrandbits(64):016x}',
+                           'results': [{word: rng.randint(0, 10 ** 6) for word in rng.sample(SYNTHETIC_WORDS, 8)}
+                                       for _ in range(rng.randint(1, 6))]}, indent=2)
+    example = f'https://api.polygon.io{path}?apiKey=*' if path else f'{{"action":"subscribe","params":"{section}.*"}}'
+    return (f'<div><div class="Container__A a"><div class="Container__B b">\n'
+            f'<a class="ScrollTargetLink__Anchor-sc-yy6ew6-0 zz" href="#{anchor_id}"><h2>{html.escape(title)}</h2></a>\n'
+            f'<div><span class="base__RequestMethod-sc-127j6tq-1 m">{method}</span>'
+            f'<div class="Text__StyledText-sc-6aor3p-0 urls">{urls}</div></div>\n'
+            f'<div class="Text__StyledText-sc-6aor3p-0 jugoJw">{_synthetic_sentence(rng, rng.randint(15, 60))}<br/>'
+            f'{_synthetic_sentence(rng, rng.randint(5, 25))}</div>\n'
+            f'<div class="Params">{"".join(params)}</div>\n'
+            f'<div class="Copy__TextWrapper-sc-71i6s4-1 bsrJTO">{html.escape(example)}</div>\n'
+            f'<div class="Attrs">{"".join(attributes)}</div>\n'
+            f'<pre>{html.escape(response)}</pre>\n'
+            f'</div></div></div>')
+
+def synthesize_page(section):
+    """Build a synthetic page for section with the markup of the live docs, seeded by the section name."""
+    rng = random.Random(section)
+    endpoints = ''.join(_synthetic_endpoint(rng, section, index, title, path)
+                        for index, (title, path) in enumerate(SYNTHETIC_CATALOGUE[section]))
+    # The live pages carry their data a second time as inline JSON and ship a large stylesheet.
+    next_data = json.dumps({'props': {'pageProps': {'section': section, 'endpoints': [
+        {'title': title, 'path': path, 'blob': ''.join(rng.choice('abcdef0123456789') for _ in range(20000))}
+        for title, path in SYNTHETIC_CATALOGUE[section]]}}})
+    style = ''.join(f'.c{rng.getrandbits(32):08x}{{margin:{rng.randint(0, 64)}px;color:#{rng.getrandbits(24):06x}}}'
+                    for _ in range(4000))
+    sidebar = ''.join(f'<li><a href="#{index}">{html.escape(title)}</a></li>'
+                      for index, (title, _) in enumerate(SYNTHETIC_CATALOGUE[section]))
+    name = section.capitalize()
+    return (f'<!doctype html><html><head><title>{name} API</title><style>{style}</style>'
+            f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script></head><body>'
+            f'<nav><a href="/">Polygon.io</a></nav><nav class="side"><ul>{sidebar}</ul></nav>'
+            f'<div id="__next" class="App"><div><div class="ScrollTrackedSection__ScrollTargetWrapper-sc-1r3wlr6-0 o">'
+            f'<h1>{name} API</h1><p class="text__IntroParagraph-sc-1lz0rk3-1 jgWzFC">'
+            f'{_synthetic_sentence(rng, 40)}</p>\n'
+            f'<div><h3>Authentication</h3><p>{_synthetic_sentence(rng, 20)}</p><p>{_synthetic_sentence(rng, 20)}</p></div>'
+            f'<span class="Text__StyledText-sc-6aor3p-0 kjHyPJ">https://api.polygon.io/v1/{section}?apiKey=*</span>'
+            f'<span class="Text__StyledText-sc-6aor3p-0 kjHyPJ">Authorization: Bearer &lt;token&gt;</span>\n'
+            f'<div><h3>Usage</h3><p>{_synthetic_sentence(rng, 30)}</p></div>'
+            f'<div><h3>Response Types</h3><p>{_synthetic_sentence(rng, 20)}</p></div></div>'
+            f'<div class="Grid__Component-sc-h1tb5o-0 Grid__StyledGrid-sc-h1tb5o-1 eKoQMw hNiMUQ '
+            f'StyledSpacing-sc-wahrw5-0 bbSzhC StyledSpacing-sc-wahrw5-0 NOTdS">'
+            f'<h2 class="Text__StyledText-sc-6aor3p-0 cCFnnL">WebSocket Documentation</h2>'
+            f'<p>Connecting to a cluster: {_synthetic_sentence(rng, 15)}</p><p>{_synthetic_sentence(rng, 25)}</p>'
+            f'<h3>Usage</h3><pre>wss://socket.polygon.io/{section}</pre>'
+            f'<span class="Text__StyledText-sc-6aor3p-0 kjHyPJ">{{"action":"auth","params":"*"}}</span>'
+            f'<span class="Text__StyledText-sc-6aor3p-0 zZEZj">Step 1: Connect</span>'
+            f'<a href="/docs/{section}/ws_getting-started"><h2>WebSocket Documentation</h2></a></div>'
+            f'<div class="Eps">{endpoints}</div></div></div></body></html>')
+
+def synthesize_fixtures(fixtures_dir, sections):
+    """Write a distinct synthetic page per section, for when the live pages cannot be recorded."""
+    os.makedirs(fixtures_dir, exist_ok=True)
+    for section in sections:
+        html_text = synthesize_page(section)
+        with open(fixture_path(fixtures_dir, section), 'w') as file:
+            file.write(html_text)
+        print(f"synthesized {section} ({len(html_text)} bytes)")
+
+def load_fixtures(fixtures_dir, sections):
+    fixtures = {}
+    for section in sections:
+        path = fixture_path(fixtures_dir, section)
+        if not os.path.exists(path):
+            raise SystemExit(f"Missing fixture {path}. Record the pages first with: python benchmark.py --record")
+        with open(path, 'r') as file:
+            fixtures[section] = file.read()
+    return fixtures
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_pipeline_once(fixtures, output_root, parser):
+    """Run the full pipeline once and return per-section stage timings and endpoint counts."""
+    results = {}
+    manifests = {}
+    for section, html_text in fixtures.items():
+        output_dir = f'{output_root}/{section}'
+        html_dir = f'{output_dir}/html'
+        markdown_dir = f'{output_dir}/markdown'
+        os.makedirs(f'{markdown_dir}/rest', exist_ok=True)
+        os.makedirs(f'{markdown_dir}/websocket', exist_ok=True)
+        os.makedirs(html_dir, exist_ok=True)
+        timings = {}
+
+        start = time.perf_counter()
+        soup = app.make_soup(html_text, parser)
+        timings['make_soup'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        app.remove_first_nav_element(soup)
+        app.extract_and_save_main_nav(soup, html_dir)
+        body = app.extract_and_save_main_content(soup, html_dir)
+        overviews = app.section_overviews(body, markdown_dir)
+        timings['extract'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = app.find_anchors_and_corresponding_divs(body, html_dir, markdown_dir, parser=parser)
+        timings['find_anchors_and_corresponding_divs'] = time.perf_counter() - start
+
+        results[section] = {'timings': timings, 'endpoints': len(report['added'])}
+        manifests[section] = {'overviews': overviews, 'endpoints': report['endpoints']}
+
+    start = time.perf_counter()
+    app.create_modular_reference(output_root, list(fixtures), manifests)
+    reference_seconds = time.perf_counter() - start
+    return results, reference_seconds
+
+def run_benchmark(fixtures, repeats=DEFAULT_REPEATS, parser=app.DEFAULT_PARSER):
+    """Run the pipeline `repeats` times and summarise the median time of every stage."""
+    runs = []
+    for _ in range(repeats):
+        output_root = tempfile.mkdtemp(prefix='polygon-bench-')
+        try:
+            runs.append(run_pipeline_once(fixtures, output_root, parser))
+        finally:
+            shutil.rmtree(output_root, ignore_errors=True)
+
+    sections = {}
+    for section in fixtures:
+        sections[section] = {
+            stage: statistics.median(run[0][section]['timings'][stage] for run in runs)
+            for stage in STAGES[:-1]
+        }
+        sections[section]['endpoints'] = runs[0][0][section]['endpoints']
+
+    stages = {stage: sum(sections[section][stage] for section in fixtures) for stage in STAGES[:-1]}
+    stages['create_modular_reference'] = statistics.median(run[1] for run in runs)
+    total_seconds = sum(stages.values())
+    endpoints = sum(section['endpoints'] for section in sections.values())
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'beautifulsoup': bs4.__version__,
+            'parser': parser,
+            'repeats': repeats,
+        },
+        'stages': stages,
+        'sections': sections,
+        'total_seconds': total_seconds,
+        'endpoints': endpoints,
+        'endpoints_per_second': endpoints / total_seconds if total_seconds else 0.0,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+def print_results(results):
+    print(f"{'stage':<40}{'seconds':>12}")
+    for stage in STAGES:
+        print(f"{stage:<40}{results['stages'][stage]:>12.4f}")
+    print(f"{'total':<40}{results['total_seconds']:>12.4f}")
+    print(f"{results['endpoints']} endpoints, {results['endpoints_per_second']:.1f} endpoints/s, "
+          f"peak RSS {results['peak_rss_kb'] / 1024:.1f} MiB")
+
+def compare_results(baseline, results, threshold=DEFAULT_THRESHOLD):
+    """Print per-stage changes against a baseline run and return True if nothing regressed."""
+    ok = True
+    metrics = [(stage, baseline['stages'].get(stage), results['stages'][stage]) for stage in STAGES]
+    metrics.append(('total', baseline.get('total_seconds'), results['total_seconds']))
+    metrics.append(('peak_rss_kb', baseline.get('peak_rss_kb'), results['peak_rss_kb']))
+    print(f"{'metric':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, old, new in metrics:
+        if not old:
+            print(f"{name:<40}{'-':>12}{new:>12.4f}{'':>10}")
+            continue
+        change = (new - old) / old
+        regressed = change > threshold
+        ok = ok and not regressed
+        print(f"{name:<40}{old:>12.4f}{new:>12.4f}{change:>+9.1%}{' REGRESSION' if regressed else ''}")
+    return ok
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Polygon.io docs pipeline on recorded pages.')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR, help='Directory holding {section}.html snapshots.')
+    parser.add_argument('--sections', nargs='+', default=app.SECTIONS, help='Sections to benchmark.')
+    parser.add_argument('--record', action='store_true', help='Download the section pages into the fixtures directory.')
+    parser.add_argument('--synthesize', action='store_true',
+                        help='Write synthetic section pages into the fixtures directory.')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help='Pipeline runs per benchmark.')
+    parser.add_argument('--parser', choices=app.PARSER_BACKENDS, default=app.DEFAULT_PARSER,
+                        help='HTML parser backend to benchmark.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a previously saved results file.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown reported as a regression when comparing.')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.record:
+        record_fixtures(args.fixtures, args.sections)
+        raise SystemExit(0)
+    if args.synthesize:
+        synthesize_fixtures(args.fixtures, args.sections)
+        raise SystemExit(0)
+
+    results = run_benchmark(load_fixtures(args.fixtures, args.sections), repeats=args.repeats, parser=args.parser)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)
+        raise SystemExit(0 if compare_results(baseline, results, args.threshold) else 1)
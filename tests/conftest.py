@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+# app.py is a script at the repository root, not an installed package.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# The recorded section pages the benchmark runs on.
+RECORDED_DIR = os.path.join(ROOT_DIR, 'fixtures')
+
+
+@pytest.fixture
+def section_html():
+    """A small synthetic section page with six REST and two WebSocket endpoints."""
+    with open(os.path.join(FIXTURES_DIR, 'section.html'), 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+@pytest.fixture
+def seed_cache(tmp_path):
+    """Return seed(sections, html_text=None), which caches a page for each section and returns the cache dir.
+
+    Without html_text, each section gets its recorded page from fixtures/.
+    """
+    cache_dir = str(tmp_path / 'cache')
+
+    def seed(sections, html_text=None):
+        for section in sections:
+            page = html_text
+            if page is None:
+                with open(os.path.join(RECORDED_DIR, f'{section}.html'), 'r', encoding='utf-8') as file:
+                    page = file.read()
+            app.store_cached_document(cache_dir, app.BASE_URL.format(section), page)
+        return cache_dir
+
+    return seed
+
+
+@pytest.fixture
+def read_tree():
+    """Return read(root), which maps every file below root to its bytes by relative path."""
+    def read(root):
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, 'rb') as file:
+                    files[os.path.relpath(path, root)] = file.read()
+        return files
+
+    return read
@@ -0,0 +1,65 @@
+import re
+import shutil
+import sqlite3
+import tarfile
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def cache_dir(seed_cache, section_html):
+    return seed_cache(['stocks'], section_html)
+
+
+@pytest.mark.parametrize('name', ['site.tar.gz', 'site.sqlite'])
+def test_archive_is_written_into_a_new_directory(tmp_path, cache_dir, name):
+    archive = str(tmp_path / 'out' / name)
+    app.run(['stocks'], output_root=str(tmp_path / 'output'), cache_dir=cache_dir, offline=True, archive=archive)
+    if name.endswith('.sqlite'):
+        with sqlite3.connect(archive) as connection:
+            paths = [path for path, in connection.execute('SELECT path FROM files')]
+    else:
+        with tarfile.open(archive) as archive_file:
+            paths = archive_file.getnames()
+    assert 'stocks/markdown/rest/aggregates_bars_0_endpoint.md' in paths
+    assert 'modual_reference.md' in paths
+
+
+def test_failed_run_keeps_the_previous_archive(tmp_path, cache_dir):
+    archive = str(tmp_path / 'out' / 'site.tar')
+    app.run(['stocks'], output_root=str(tmp_path / 'output'), cache_dir=cache_dir, offline=True, archive=archive)
+    with open(archive, 'rb') as file:
+        before = file.read()
+    with pytest.raises(Exception, match='No cached copy'):
+        app.run(['stocks', 'options'], output_root=str(tmp_path / 'output'), cache_dir=cache_dir, offline=True,
+                archive=archive)
+    with open(archive, 'rb') as file:
+        assert file.read() == before
+    assert not (tmp_path / 'out' / 'site.tar.tmp').exists()
+
+
+def test_archive_ignores_manifests_of_directory_runs(tmp_path, seed_cache, section_html, capsys):
+    output_root = str(tmp_path / 'output')
+    cache_dir = seed_cache(['stocks', 'options'], section_html)
+    app.run(['stocks', 'options'], output_root=output_root, cache_dir=cache_dir, offline=True)
+    capsys.readouterr()
+
+    archive = str(tmp_path / 'site.tar')
+    app.run(['stocks'], output_root=output_root, cache_dir=cache_dir, offline=True, archive=archive)
+    assert capsys.readouterr().out.startswith('stocks: 8 added, 0 changed, 0 removed, 0 unchanged')
+    with tarfile.open(archive) as archive_file:
+        paths = set(archive_file.getnames())
+        reference = archive_file.extractfile('modual_reference.md').read().decode('utf-8')
+    links = re.findall(r'\]\(([^)]+)\)', reference)
+    assert links and all(link.startswith('stocks/') for link in links)
+    assert set(links) <= paths
+
+
+def test_direct_writes_recreate_a_removed_output_directory(tmp_path, section_html):
+    output_dir = str(tmp_path / 'stocks')
+    app.process_section(app.make_soup(section_html), output_dir)
+    shutil.rmtree(output_dir)
+    app.process_section(app.make_soup(section_html), output_dir)
+    assert (tmp_path / 'stocks' / 'markdown' / 'rest' / 'aggregates_bars_0_endpoint.md').exists()
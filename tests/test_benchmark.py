@@ -0,0 +1,13 @@
+import benchmark
+
+
+def test_benchmark_runs_every_stage_on_a_recorded_page():
+    results = benchmark.run_benchmark(benchmark.load_fixtures(benchmark.DEFAULT_FIXTURES_DIR, ['indices']), repeats=1)
+    assert set(results['stages']) == set(benchmark.STAGES)
+    assert results['endpoints'] == 16
+    assert results['endpoints_per_second'] > 0
+
+
+def test_synthesized_pages_differ_between_sections():
+    assert benchmark.synthesize_page('crypto') != benchmark.synthesize_page('forex')
+    assert benchmark.synthesize_page('stocks') == benchmark.synthesize_page('stocks')
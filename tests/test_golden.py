@@ -0,0 +1,16 @@
+import os
+
+import app
+
+# Generated by the original script (before the pipeline rewrite) from tests/fixtures/section.html.
+# Only the "Loose heading" page it produced is left out: an <a><h2> without the
+# ScrollTargetLink__Anchor class is a plain link, not an endpoint.
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'golden')
+
+
+def test_markdown_matches_the_original_output(tmp_path, section_html, read_tree):
+    report = app.process_section(app.make_soup(section_html), str(tmp_path / 'stocks'))
+    app.create_modular_reference(str(tmp_path), ['stocks'],
+                                 {'stocks': {'overviews': report['overviews'], 'endpoints': report['endpoints']}})
+    produced = {path: data for path, data in read_tree(tmp_path).items() if path.endswith('.md')}
+    assert produced == read_tree(GOLDEN_DIR)
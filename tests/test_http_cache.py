@@ -0,0 +1,108 @@
+import http.server
+import os
+import stat
+import threading
+
+import pytest
+
+import app
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+
+@pytest.fixture
+def page_server(section_html):
+    """Serve section_html with an ETag, answering 304 to a matching If-None-Match."""
+    body = section_html.encode('utf-8')
+    requests_seen = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(dict(self.headers))
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+                self.send_header('ETag', ETAG)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', ETAG)
+            self.send_header('Last-Modified', LAST_MODIFIED)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}/docs/stocks/getting-started', requests_seen
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_revalidates_with_etag_and_reuses_cache_on_304(tmp_path, page_server, section_html, stream):
+    url, requests_seen = page_server
+    cache_dir = str(tmp_path)
+    session = app.create_session(pool_size=1, retries=0)
+    with session:
+        assert app.fetch_html_document(url, session, cache_dir=cache_dir, stream=stream) == section_html
+        entry, cached = app.load_cached_document(cache_dir, url)
+        assert cached == section_html
+        assert entry['etag'] == ETAG and entry['last_modified'] == LAST_MODIFIED
+
+        assert app.fetch_html_document(url, session, cache_dir=cache_dir, stream=stream) == section_html
+
+    assert 'If-None-Match' not in requests_seen[0]
+    assert requests_seen[1]['If-None-Match'] == ETAG
+    assert requests_seen[1]['If-Modified-Since'] == LAST_MODIFIED
+
+
+def test_streamed_error_response_is_closed(tmp_path):
+    class Response:
+        status_code = 503
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    class Session:
+        def get(self, url, **kwargs):
+            return response
+
+    response = Response()
+    with pytest.raises(Exception, match='Status code: 503'):
+        app.fetch_html_document('http://example.invalid/docs', Session(), cache_dir=str(tmp_path), stream=True)
+    assert response.closed
+
+
+def test_offline_replays_cache_without_requests(tmp_path, page_server, section_html):
+    url, requests_seen = page_server
+    cache_dir = str(tmp_path)
+    app.fetch_html_document(url, cache_dir=cache_dir)
+    assert app.fetch_html_document(url, cache_dir=cache_dir, offline=True) == section_html
+    assert len(requests_seen) == 1
+
+
+def test_offline_without_cached_copy_fails(tmp_path):
+    with pytest.raises(Exception, match='No cached copy'):
+        app.fetch_html_document('http://127.0.0.1:9/missing', cache_dir=str(tmp_path), offline=True)
+
+
+def test_cached_files_get_umask_permissions(tmp_path, section_html):
+    cache_dir = str(tmp_path)
+    url = 'http://127.0.0.1:9/docs/stocks'
+    previous = os.umask(0o027)
+    try:
+        app.store_cached_document(cache_dir, url, section_html)
+    finally:
+        os.umask(previous)
+    paths = [os.path.join(directory, name) for directory, _, names in os.walk(cache_dir) for name in names]
+    assert len(paths) == 2
+    assert {stat.S_IMODE(os.stat(path).st_mode) for path in paths} == {0o640}
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import app
+
+
+def without_endpoint(html_text, name):
+    """The page with the container of the named endpoint cut out."""
+    start, end = next((start, end) for found, _, start, end in app.scan_endpoint_anchors(html_text) if found == name)
+    return html_text[:start] + html_text[end:]
+
+
+def with_colliding_titles(html_text):
+    """The page with a WebSocket channel titled like a REST endpoint, as with Trades on the live docs."""
+    return html_text.replace('<h2>Trades WS 0</h2>', '<h2>Aggregates (Bars) 0</h2>')
+
+
+@pytest.mark.parametrize('bump_version', [False, True])
+def test_removed_endpoint_files_are_deleted_on_full_rebuild(tmp_path, monkeypatch, section_html, bump_version):
+    output_dir = str(tmp_path / 'stocks')
+    app.process_section(app.make_soup(section_html), output_dir)
+    stale = [f'{output_dir}/markdown/rest/aggregates_bars_3_endpoint.md',
+             f'{output_dir}/html/aggregates_bars_3_endpoint.html']
+    assert all(os.path.exists(path) for path in stale)
+
+    if bump_version:
+        monkeypatch.setattr(app, 'RENDERER_VERSION', app.RENDERER_VERSION + 1)
+    report = app.process_section(app.make_soup(without_endpoint(section_html, 'aggregates_bars_3')), output_dir,
+                                 incremental=bump_version)
+    assert report['removed'] == ['rest/aggregates_bars_3_endpoint']
+    assert not any(os.path.exists(path) for path in stale)
+    assert 'rest/aggregates_bars_3_endpoint' not in app.read_manifest(f'{output_dir}/manifest.json')['endpoints']
+
+
+def test_forced_filtered_run_reports_existing_endpoints_as_changed(tmp_path, section_html):
+    output_dir = str(tmp_path / 'stocks')
+    app.process_section(app.make_soup(section_html), output_dir)
+    report = app.process_section_endpoints(section_html, output_dir, ['aggregates_bars_1'], incremental=False)
+    assert report['added'] == []
+    assert report['changed'] == ['rest/aggregates_bars_1_endpoint']
+    assert len(app.read_manifest(f'{output_dir}/manifest.json')['endpoints']) == 8
+
+
+def test_endpoint_filters_reject_an_openapi_document(tmp_path):
+    with pytest.raises(ValueError, match='OpenAPI'):
+        app.run(['stocks'], output_root=str(tmp_path), offline=True, endpoints=['trades*'],
+                openapi_path=str(tmp_path / 'openapi.json'))
+    assert not (tmp_path / 'openapi.json').exists()
+
+
+def test_rest_and_websocket_endpoints_with_the_same_title_are_tracked_apart(tmp_path, section_html):
+    output_dir = str(tmp_path / 'stocks')
+    html_text = with_colliding_titles(section_html)
+    report = app.process_section(app.make_soup(html_text), output_dir)
+    assert len(report['added']) == 8
+    assert {'rest/aggregates_bars_0_endpoint', 'websocket/aggregates_bars_0_endpoint'} <= set(report['added'])
+
+    report = app.process_section(app.make_soup(html_text), output_dir)
+    assert (report['added'], report['changed'], report['removed']) == ([], [], [])
+    assert len(report['unchanged']) == 8
+    assert os.path.exists(f'{output_dir}/markdown/rest/aggregates_bars_0_endpoint.md')
+    assert os.path.exists(f'{output_dir}/markdown/websocket/aggregates_bars_0_endpoint.md')
+
+
+@pytest.mark.parametrize('bump_version', [False, True])
+def test_filtered_run_requires_a_current_manifest(tmp_path, monkeypatch, section_html, bump_version):
+    output_dir = str(tmp_path / 'stocks')
+    if bump_version:
+        app.process_section(app.make_soup(section_html), output_dir)
+        monkeypatch.setattr(app, 'RENDERER_VERSION', app.RENDERER_VERSION + 1)
+    manifest = app.read_manifest(f'{output_dir}/manifest.json')
+    with pytest.raises(ValueError, match='run without endpoint filters first'):
+        app.process_section_endpoints(section_html, output_dir, ['aggregates_bars_1'])
+    with pytest.raises(ValueError, match='run without endpoint filters first'):
+        app.run(['stocks'], output_root=str(tmp_path), offline=True, endpoints=['aggregates_bars_1'])
+    assert app.read_manifest(f'{output_dir}/manifest.json') == manifest
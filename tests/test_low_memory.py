@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize('parser', app.PARSER_BACKENDS)
+def test_low_memory_output_matches_process_section(tmp_path, section_html, read_tree, parser):
+    app.process_section(app.make_soup(section_html, parser), str(tmp_path / 'default'), parser=parser)
+    app.process_section_low_memory(section_html, str(tmp_path / 'low_memory'), parser=parser)
+
+    default = read_tree(tmp_path / 'default')
+    # Low-memory runs skip the body.html debug copy; everything else is identical.
+    assert default.pop(os.path.join('html', 'body.html'))
+    assert read_tree(tmp_path / 'low_memory') == default
+
+
+def test_low_memory_removes_a_stale_body(tmp_path, section_html):
+    output_dir = str(tmp_path / 'stocks')
+    app.process_section(app.make_soup(section_html), output_dir)
+    app.process_section_low_memory(section_html, output_dir)
+    assert not os.path.exists(f'{output_dir}/html/body.html')
+
+
+def test_low_memory_keeps_endpoints_the_scan_missed(tmp_path, monkeypatch, capsys, section_html, read_tree):
+    output_dir = str(tmp_path / 'stocks')
+    app.process_section(app.make_soup(section_html), output_dir)
+    expected = read_tree(output_dir)
+
+    scan = app.scan_endpoint_anchors
+    monkeypatch.setattr(app, 'scan_endpoint_anchors', lambda html_text: scan(html_text)[1:])
+    report = app.process_section_low_memory(section_html, output_dir)
+    assert report['removed'] == []
+    assert len(report['endpoints']) == 8
+    assert read_tree(output_dir) == expected
+    captured = capsys.readouterr()
+    assert 'the endpoint scan missed 1 endpoint(s)' in captured.err
+    assert captured.out == ''
+
+
+def test_low_memory_run_bounds_the_pages_in_flight(tmp_path, monkeypatch, seed_cache, section_html):
+    cache_dir = seed_cache(app.SECTIONS, section_html)
+    fetched, processed, peak = [], [], []
+    fetch, process = app.fetch_html_document, app.process_section_low_memory
+
+    def counting_fetch(*args, **kwargs):
+        fetched.append(args[0])
+        peak.append(len(fetched) - len(processed))
+        return fetch(*args, **kwargs)
+
+    def counting_process(*args, **kwargs):
+        try:
+            return process(*args, **kwargs)
+        finally:
+            processed.append(args[1])
+
+    monkeypatch.setattr(app, 'fetch_html_document', counting_fetch)
+    monkeypatch.setattr(app, 'process_section_low_memory', counting_process)
+    app.run(app.SECTIONS, output_root=str(tmp_path / 'output'), cache_dir=cache_dir, offline=True, low_memory=True)
+    assert len(processed) == len(app.SECTIONS)
+    assert max(peak) <= 1 + app.LOW_MEMORY_PREFETCH
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import app
+
+
+def test_spec_for_section_validates(tmp_path, section_html):
+    validator = pytest.importorskip('openapi_spec_validator')
+    # The writer creates the directory of the spec itself.
+    path = str(tmp_path / 'output' / 'openapi.json')
+    with app.OpenApiWriter(path) as spec:
+        app.process_section(app.make_soup(section_html), str(tmp_path / 'stocks'), spec=spec, section='stocks')
+    with open(path, 'r') as file:
+        document = json.load(file)
+    validator.validate(document)
+    # Six REST endpoints; the WebSocket channels are left out.
+    assert len(document['paths']) == 6
+
+
+def test_shared_endpoints_are_tagged_with_the_first_section(tmp_path, seed_cache, section_html):
+    cache_dir = seed_cache(['stocks', 'options', 'indices'], section_html)
+    specs = []
+    for run_number in range(3):
+        path = str(tmp_path / f'openapi{run_number}.json')
+        app.run(['stocks', 'options', 'indices'], output_root=str(tmp_path / f'output{run_number}'),
+                cache_dir=cache_dir, offline=True, concurrency=3, openapi_path=path)
+        with open(path, 'rb') as file:
+            specs.append(file.read())
+    assert specs[0] == specs[1] == specs[2]
+    operations = [operation for item in json.loads(specs[0])['paths'].values() for operation in item.values()]
+    assert {tag for operation in operations for tag in operation['tags']} == {'stocks'}
+
+
+def test_every_url_and_method_of_an_endpoint_is_emitted(tmp_path):
+    endpoint = app.Endpoint(methods=[
+        app.EndpointMethod('GET', [app.EndpointUrl('Latest:', '/v1/last/{ticker}'),
+                                   app.EndpointUrl('Historic:', '/v1/history/{ticker}')]),
+        app.EndpointMethod('POST', [app.EndpointUrl(None, '/v1/last/{ticker}')]),
+        app.EndpointMethod('WS', [app.EndpointUrl(None, 'wss://socket.polygon.io/stocks')]),
+    ])
+    path = str(tmp_path / 'openapi.json')
+    with app.OpenApiWriter(path) as spec:
+        assert spec.add_endpoint('Last Trade', endpoint, tag='stocks')
+        assert not spec.add_endpoint('Last Trade', endpoint, tag='options')
+    with open(path, 'r') as file:
+        paths = json.load(file)['paths']
+    assert {path: sorted(item) for path, item in paths.items()} == {
+        '/v1/last/{ticker}': ['get', 'post'], '/v1/history/{ticker}': ['get']}
+    assert paths['/v1/history/{ticker}']['get']['summary'] == 'Last Trade (Historic)'
+    operation_ids = [operation['operationId'] for item in paths.values() for operation in item.values()]
+    assert len(set(operation_ids)) == 3
@@ -0,0 +1,54 @@
+import glob
+import os
+
+import pytest
+
+import app
+
+# The recorded section pages the benchmark runs on; lxml is a test dependency, so parity is always checked.
+RECORDED_PAGES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                               'fixtures', '*.html')))
+
+ANCHOR = '<a class="ScrollTargetLink__Anchor-sc-yy6ew6-0 zz" href="#get_v2_aggs_0">'
+
+
+@pytest.mark.parametrize('old, new', [
+    *[('<div><div class="Container__A a">', f'{container}<div class="Container__A a">')
+      for container in ['<div>', '<div data-class="x">', '<div class>', "<div id='a' class=''>"]],
+    (ANCHOR, '<a title="a > b" class="ScrollTargetLink__Anchor-sc-yy6ew6-0 zz" href="#get_v2_aggs_0">'),
+    (ANCHOR, "<a data-x='>' class=\"ScrollTargetLink__Anchor-sc-yy6ew6-0 zz\" href=\"#get_v2_aggs_0\">"),
+])
+def test_scan_finds_the_containers_of_the_tree_index(section_html, old, new):
+    assert old in section_html
+    html_text = section_html.replace(old, new)
+    scanned = [(name, str(app.make_soup(html_text[start:end]).div))
+               for name, _, start, end in app.scan_endpoint_anchors(html_text)]
+    indexed = [(name, str(element)) for _, name, element in app.index_endpoint_anchors(app.make_soup(html_text))]
+    assert len(scanned) == 8
+    assert scanned == indexed
+
+
+def test_backends_render_identical_markdown(section_html):
+    mismatches = app.check_parser_parity(section_html, app.PARSER_BACKENDS)
+    assert mismatches == {backend: [] for backend in app.PARSER_BACKENDS[1:]}
+
+
+def test_every_section_has_a_recorded_page():
+    assert [os.path.basename(page) for page in RECORDED_PAGES] == sorted(f'{section}.html' for section in app.SECTIONS)
+
+
+@pytest.mark.parametrize('page', RECORDED_PAGES, ids=os.path.basename)
+def test_backends_render_identical_markdown_for_recorded_pages(page):
+    with open(page, 'r', encoding='utf-8') as file:
+        mismatches = app.check_parser_parity(file.read(), app.PARSER_BACKENDS)
+    assert mismatches == {backend: [] for backend in app.PARSER_BACKENDS[1:]}
+
+
+def test_cached_parity_fails_without_recorded_pages(tmp_path, capsys):
+    assert app.check_cached_parser_parity(app.SECTIONS, cache_dir=str(tmp_path)) is False
+    assert 'No recorded pages' in capsys.readouterr().out
+
+
+def test_cached_parity_compares_recorded_pages(seed_cache, section_html):
+    cache_dir = seed_cache(['stocks'], section_html)
+    assert app.check_cached_parser_parity(['stocks'], cache_dir=cache_dir) is True
@@ -0,0 +1,28 @@
+import pytest
+
+import app
+
+
+def event(name, ts, dur, category='stage', tid=1):
+    return {'name': name, 'cat': category, 'ph': 'X', 'ts': ts, 'dur': dur, 'pid': 1, 'tid': tid, 'args': {}}
+
+
+def test_self_times_exclude_nested_spans():
+    profiler = app.Profiler()
+    profiler.events = [
+        event('write_endpoint_files', 60000, 10000),
+        event('find_anchors_and_corresponding_divs', 0, 100000),
+        event('index_endpoint_anchors', 0, 30000),
+        event('parse_endpoint', 40000, 5000, 'extractor'),
+        event('fetch_html_document', 10000, 50000, tid=2),
+    ]
+    assert profiler.self_times() == [10000, 55000, 30000, 5000, 50000]
+    assert '55.0  stage      find_anchors_and_corresponding_divs' in profiler.summary()
+
+
+def test_failed_run_turns_profiling_off(tmp_path):
+    with pytest.raises(Exception, match='No cached copy'):
+        app.run(['stocks'], output_root=str(tmp_path / 'output'), cache_dir=str(tmp_path / 'cache'), offline=True,
+                profile=True)
+    assert app.PROFILER is None
+    assert app.WRITER is None
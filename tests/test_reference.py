@@ -0,0 +1,16 @@
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize('from_disk', [False, True])
+def test_reference_lists_rest_and_websocket_pages_with_the_same_title(tmp_path, section_html, from_disk):
+    # A WebSocket channel titled like a REST endpoint, as with Trades on the live docs.
+    html_text = section_html.replace('<h2>Trades WS 0</h2>', '<h2>Aggregates (Bars) 0</h2>')
+    report = app.process_section(app.make_soup(html_text), str(tmp_path / 'stocks'))
+    manifests = None if from_disk else {'stocks': {'overviews': report['overviews'], 'endpoints': report['endpoints']}}
+    app.create_modular_reference(str(tmp_path), ['stocks'], manifests)
+    reference = (tmp_path / 'modual_reference.md').read_text()
+    assert '- [Aggregates (Bars) 0](stocks/markdown/rest/aggregates_bars_0_endpoint.md)\n' in reference
+    assert '- [Aggregates (Bars) 0](stocks/markdown/websocket/aggregates_bars_0_endpoint.md)\n' in reference
+    assert reference.count('](stocks/markdown/') == 10
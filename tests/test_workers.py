@@ -0,0 +1,17 @@
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_process_pool_output_matches_in_process_rendering(tmp_path, seed_cache, read_tree, capsys, low_memory):
+    cache_dir = seed_cache(app.SECTIONS)
+    outputs = []
+    for workers in (1, 2):
+        output_root = str(tmp_path / f'workers{workers}')
+        app.run(app.SECTIONS, output_root=output_root, cache_dir=cache_dir, offline=True, workers=workers,
+                low_memory=low_memory, openapi_path=f'{output_root}/openapi.json')
+        # The report lists endpoints in page order, so it also checks the rendering order.
+        outputs.append((read_tree(output_root), capsys.readouterr().out))
+    assert outputs[0][0]
+    assert outputs[0] == outputs[1]